@@ -0,0 +1,181 @@
+"""Asyncio scraping engine built on playwright.async_api.
+
+Produces the same Business / BusinessList output as the sync path in main.py,
+but opens place detail pages in their own tabs: while the results feed keeps
+scrolling, up to `tabs` detail pages are extracted concurrently on one browser.
+
+The embed HTML is built by embed.build_embed_html; the Share -> Embed -> Copy
+HTML clipboard check is not available here since the clipboard is shared by
+every tab of the browser and concurrent copies would race.
+"""
+import asyncio
+import os
+import time
+
+from playwright.async_api import async_playwright
+
+from dedupe import DedupeIndex
+from harvester import FEED_STATE_JS, SCROLL_FEED_JS, place_key, search_url
+from lean import is_blocked
+from ratecontrol import RateController, ThrottledError, is_blocked_page_async
+from session import save_session_async, session_state
+from readiness import PLACE_NAME_SELECTOR
+from main import Business, BusinessList, save_business_list
+from panel_extract import panel_to_business, read_panel_async
+
+PLACE_LINK_XPATH = '//a[contains(@href, "https://www.google.com/maps/place")]'
+
+
+async def harvest_place_urls(page, search_for: str, total: int, href_queue: asyncio.Queue,
+                             patience: int = 3, log_prefix: str = "", url: str = None) -> tuple:
+    """Search and scroll the results feed, pushing every new place href to
+    `href_queue` as soon as it shows up. A None sentinel marks the end.
+
+    The page navigates to `url` (a /maps/search/ URL with a viewport) or to the
+    search's URL. Returns (hrefs seen, end of list reached).
+    """
+    seen = set()
+    ended = False
+    try:
+        await page.goto(url or search_url(search_for), timeout=20000)
+        await page.wait_for_selector(PLACE_LINK_XPATH, timeout=15000)
+
+        stale_rounds = 0
+        while len(seen) < total and stale_rounds < patience:
+            state = await page.evaluate(FEED_STATE_JS)
+            fresh = 0
+            for href in state["hrefs"]:
+                key = place_key(href)
+                if key in seen or len(seen) >= total:
+                    continue
+                seen.add(key)
+                fresh += 1
+                await href_queue.put(href)
+            if state["end"]:
+                ended = True
+                break
+            stale_rounds = 0 if fresh else stale_rounds + 1
+            print(f"{log_prefix}Currently Scraped: ", len(seen), end='\r')
+
+            if not await page.evaluate(SCROLL_FEED_JS):
+                await page.hover(PLACE_LINK_XPATH)
+                await page.mouse.wheel(0, 10000)
+            await page.wait_for_timeout(1500)
+        print(f"{log_prefix}Total Scraped: {len(seen)}")
+    finally:
+        await href_queue.put(None)
+    return len(seen), ended
+
+
+async def extract_place(page, search_for: str, business_list: BusinessList) -> Business:
+    """Extract one opened place detail page into a Business"""
+    record = await read_panel_async(page)
+    business = panel_to_business(record, search_for)
+
+    try:
+        if business.name and record.get("photo"):
+            response = await page.request.get(record["photo"])
+            if response.ok:
+                business_list.save_image(business, await response.body())
+    except Exception as e:
+        print(f"Error saving image: {e}")
+    return business
+
+
+async def scrape_place(context, href: str, search_for: str, business_list: BusinessList,
+                       semaphore, log_prefix: str = ""):
+    """Open `href` in its own tab (bounded by `semaphore`, or paced by a
+    ratecontrol.RateController) and extract it
+    """
+    controller = semaphore if isinstance(semaphore, RateController) else None
+    async with semaphore:
+        page = await context.new_page()
+        try:
+            started = time.perf_counter()
+            try:
+                await page.goto(href, timeout=20000)
+                await page.wait_for_selector(PLACE_NAME_SELECTOR, timeout=15000)
+            except Exception:
+                if controller is not None:
+                    controller.observe(controller.classify(
+                        0, timed_out=True, blocked=await is_blocked_page_async(page)
+                    ))
+                raise
+            business = await extract_place(page, search_for, business_list)
+            if controller is not None:
+                controller.observe(controller.classify((time.perf_counter() - started) * 1000, business.name))
+            if business_list.first_record_at is None:
+                # businesses are added in feed order at the end, mark the first one here
+                business_list.first_record_at = time.perf_counter()
+            print(f"{log_prefix}Business: {business.name}, Telah disimpan", end='\r')
+            return business
+        except ThrottledError:
+            raise
+        except Exception as e:
+            print(f'{log_prefix}Error occurred: {e}')
+            return None
+        finally:
+            await page.close()
+
+
+async def scrape_search_async(context, page, search_for: str, total: int, tabs: int,
+                              log_prefix: str = "", dedupe=None, controller=None) -> BusinessList:
+    """Run one search: scroll the feed on `page` and extract places on up to
+    `tabs` extra tabs (or as many as `controller` allows) while scrolling continues
+    """
+    business_list = BusinessList(dedupe=dedupe, search_for=search_for)
+    semaphore = controller or asyncio.Semaphore(tabs)
+    href_queue = asyncio.Queue()
+
+    harvester = asyncio.create_task(
+        harvest_place_urls(page, search_for, total, href_queue, log_prefix=log_prefix)
+    )
+    keys, tasks = [], []
+    while (href := await href_queue.get()) is not None:
+        keys.append(place_key(href))
+        tasks.append(asyncio.create_task(
+            scrape_place(context, href, search_for, business_list, semaphore, log_prefix)
+        ))
+    await harvester
+
+    # add in feed order so output matches the sync engine
+    for key, business in zip(keys, await asyncio.gather(*tasks)):
+        if business is not None:
+            business_list.add_business(business, key)
+    return business_list
+
+
+async def block_route(route):
+    """context.route handler applying the lean profile's blocking rules"""
+    if is_blocked(route.request.url, route.request.resource_type):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def run_async(search_list: list[str], total: int, tabs: int = 4, lean: bool = False,
+                    dedupe_meters: float = 25, adaptive: bool = False, max_blocks: int = 3,
+                    session: str = None):
+    """Async counterpart of main(): scrape and save every search in `search_list`"""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=lean)
+        context = await browser.new_context(locale="en-GB", storage_state=session_state(session))
+        if lean:
+            await context.route("**/*", block_route)
+        page = await context.new_page()
+        dedupe = DedupeIndex(dedupe_meters, os.path.join(BusinessList.save_at, 'dedupe_log.jsonl'))
+        controller = RateController(max_concurrency=tabs, max_blocks=max_blocks) if adaptive else None
+
+        for search_for_index, search_for in enumerate(search_list):
+            print(f"-----\n{search_for_index} - {search_for}".strip())
+            business_list = await scrape_search_async(context, page, search_for, total, tabs, dedupe=dedupe,
+                                                      controller=controller)
+            save_business_list(business_list, search_for)
+
+        await save_session_async(context, session)
+        await context.close()
+        await browser.close()
+    dedupe.close()
+    dedupe.print_summary()
+    if controller is not None:
+        controller.print_summary()
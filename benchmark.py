@@ -0,0 +1,195 @@
+"""Offline throughput benchmark against the local Maps stand-in.
+
+Starts fixture_server.FixtureServer and routes https://www.google.com/* of
+the browser to it, so the unchanged scraping code (same selectors, readiness
+waits, image and embed handling) runs without network access. Every engine /
+configuration runs in its own spawned process and reports places per minute,
+time to first record and peak memory (Python heap via tracemalloc, and the
+max RSS of the scraping process; the browser's own memory is not included).
+
+    python benchmark.py                       # every configuration
+    python benchmark.py -c sync -c async --places 200 --latency-ms 250
+    python benchmark.py --json bench.jsonl    # append results for comparison
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+QUERY = "wisata kota Batu"
+MAPS_URL = "https://www.google.com/maps"
+
+# name -> options of one benchmark run
+CONFIGS = {
+    "sync": {"engine": "sync"},
+    "sync-images": {"engine": "sync", "image_threads": 4},
+    "sync-verify-embed": {"engine": "sync", "verify_embed": True},
+    "sync-lean": {"engine": "sync", "lean": True},
+    "async": {"engine": "async", "tabs": 4},
+}
+
+
+def fixture_url(base_url: str, url: str) -> str:
+    """The fixture server URL serving `url` (an https://www.google.com URL)"""
+    return base_url + url.split("://www.google.com", 1)[1]
+
+
+def route_to_fixture(context, base_url: str):
+    """Serve every www.google.com request of a sync context from the fixture server"""
+    context.route("https://www.google.com/**",
+                  lambda route: route.fulfill(response=route.fetch(url=fixture_url(base_url, route.request.url))))
+
+
+async def route_to_fixture_async(context, base_url: str):
+    async def handle(route):
+        await route.fulfill(response=await route.fetch(url=fixture_url(base_url, route.request.url)))
+    await context.route("https://www.google.com/**", handle)
+
+
+def run_sync(base_url: str, options: dict, total: int, executable_path: str = None) -> tuple:
+    from playwright.sync_api import sync_playwright
+
+    from lean import launch_context
+    from main import BusinessList, save_business_list, scrape_search
+
+    downloader = None
+    if options.get("image_threads"):
+        from images import ImageDownloader
+        downloader = ImageDownloader(os.path.join(BusinessList.save_at, 'images'), threads=options["image_threads"])
+
+    with sync_playwright() as p:
+        browser, context = launch_context(p, lean=options.get("lean", False), headless=True,
+                                          executable_path=executable_path)
+        route_to_fixture(context, base_url)
+        page = context.new_page()
+        page.goto(MAPS_URL, timeout=20000)
+
+        started = time.perf_counter()
+        business_list = scrape_search(page, QUERY, total, verify_embed=options.get("verify_embed", False),
+                                      downloader=downloader)
+        save_business_list(business_list, QUERY)
+        if downloader is not None:
+            downloader.close()
+        elapsed = time.perf_counter() - started
+        browser.close()
+    return business_list, started, elapsed
+
+
+def run_async_engine(base_url: str, options: dict, total: int, executable_path: str = None) -> tuple:
+    import asyncio
+
+    from playwright.async_api import async_playwright
+
+    from async_engine import scrape_search_async
+    from main import save_business_list
+
+    async def run():
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, executable_path=executable_path)
+            context = await browser.new_context(locale="en-GB")
+            await route_to_fixture_async(context, base_url)
+            page = await context.new_page()
+            await page.goto(MAPS_URL, timeout=20000)
+
+            started = time.perf_counter()
+            business_list = await scrape_search_async(context, page, QUERY, total, options.get("tabs", 4))
+            save_business_list(business_list, QUERY)
+            elapsed = time.perf_counter() - started
+            await browser.close()
+        return business_list, started, elapsed
+
+    return asyncio.run(run())
+
+
+def run_config(name: str, base_url: str, total: int, output_dir: str, executable_path: str = None) -> dict:
+    """Run one configuration (in a fresh process) and return its measurements"""
+    from main import BusinessList
+    BusinessList.save_at = os.path.join(output_dir, name)
+    os.makedirs(BusinessList.save_at, exist_ok=True)
+
+    options = CONFIGS[name]
+    tracemalloc.start()
+    run = run_async_engine if options["engine"] == "async" else run_sync
+    business_list, started, elapsed = run(base_url, options, total, executable_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    places = len(business_list)
+    first = business_list.first_record_at
+    return {
+        "config": name,
+        "places": places,
+        "seconds": round(elapsed, 2),
+        "places_per_minute": round(places / elapsed * 60, 1) if elapsed else 0.0,
+        "first_record_s": round(first - started, 2) if first else None,
+        "peak_python_mb": round(peak / 1_048_576, 1),
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                            / (1_048_576 if sys.platform == "darwin" else 1024), 1),
+    }
+
+
+def print_table(results: list[dict]):
+    print(f"{'config':<20}{'places':>7}{'seconds':>9}{'places/min':>12}{'first s':>9}{'py MB':>8}{'rss MB':>8}")
+    for r in results:
+        first = f"{r['first_record_s']:.2f}" if r["first_record_s"] is not None else "-"
+        print(
+            f"{r['config']:<20}{r['places']:>7}{r['seconds']:>9.1f}{r['places_per_minute']:>12.1f}"
+            f"{first:>9}{r['peak_python_mb']:>8.1f}{r['max_rss_mb']:>8.1f}"
+        )
+
+
+def main():
+    from fixture_server import FixtureServer, generate_places, load_places
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--config", action="append", choices=sorted(CONFIGS),
+                        help="configuration to run (repeatable, default: all)")
+    parser.add_argument("--places", type=int, default=60, help="places in the fixture feed")
+    parser.add_argument("--fixture", type=str, help="JSON file of recorded places instead of generated ones")
+    parser.add_argument("-t", "--total", type=int, help="places to scrape per run (default: the whole feed)")
+    parser.add_argument("--latency-ms", type=float, default=100, help="artificial latency per fixture request")
+    parser.add_argument("--jitter-ms", type=float, default=30)
+    parser.add_argument("--executable-path", type=str, help="Chromium binary to use instead of Playwright's")
+    parser.add_argument("--json", type=str, help="append the results to this JSON lines file")
+    args = parser.parse_args()
+
+    places = load_places(args.fixture) if args.fixture else generate_places(args.places)
+    server = FixtureServer(places, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms).start()
+    total = args.total or len(places)
+    print(f"Fixture: {len(places)} places on {server.base_url}, latency {args.latency_ms:g}±{args.jitter_ms:g} ms")
+
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    try:
+        with tempfile.TemporaryDirectory(prefix="gmaps-bench-") as output_dir:
+            for name in args.config or list(CONFIGS):
+                print(f"-----\n{name}")
+                # a fresh process per run keeps max RSS and module state separate
+                with spawn.Pool(1) as pool:
+                    try:
+                        results.append(pool.apply(
+                            run_config, (name, server.base_url, total, output_dir, args.executable_path)
+                        ))
+                    except Exception as e:
+                        print(f"{name} failed: {str(e).splitlines()[0]}")
+    finally:
+        server.stop()
+
+    print("-----")
+    print_table(results)
+    if args.json:
+        with open(args.json, 'a', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps({
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "latency_ms": args.latency_ms, **result,
+                }) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Persistent SQLite cache of scraped places.
+
+Records are keyed by place key (the data id from the place URL, see
+harvester.place_key) so overlapping searches and repeated runs reuse a place
+instead of clicking it again. Every entry stores the Business fields and the
+downloaded image bytes, expires after `ttl_days` and the least recently used
+entries are evicted once the cache grows past `max_mb`.
+"""
+import json
+import os
+import sqlite3
+import time
+from dataclasses import asdict
+
+from main import Business, get_kategori_id, search_category
+
+DEFAULT_CACHE_PATH = os.path.join('GMaps Data', 'place_cache.sqlite')
+
+
+class PlaceCache:
+    """SQLite-backed place cache with TTL and size-based LRU eviction"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_days: float = 7, max_mb: float = 512):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS places (
+                key TEXT PRIMARY KEY,
+                record TEXT NOT NULL,
+                image BLOB,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS places_accessed ON places (accessed)")
+        self.conn.commit()
+
+    def get(self, key: str, search_for: str):
+        """Return (Business, image bytes) for `key`, or None on a miss.
+
+        The search-derived fields (category, kategori_id) are recomputed for
+        `search_for` since the place may have been cached by another search.
+        """
+        row = self.conn.execute(
+            "SELECT record, image, created FROM places WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            self.misses += 1
+            return None
+        record, image, created = row
+        if now - created > self.ttl_seconds:
+            self.conn.execute("DELETE FROM places WHERE key = ?", (key,))
+            self.conn.commit()
+            self.expired += 1
+            self.misses += 1
+            return None
+
+        self.conn.execute("UPDATE places SET accessed = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        business = Business(**json.loads(record))
+        business.category = search_category(search_for)
+        business.kategori_id = get_kategori_id(business.category)
+        return business, image
+
+    def put(self, key: str, business: Business, image: bytes = None):
+        """Store or refresh a place, then evict down to the size limit"""
+        record = json.dumps(asdict(business))
+        size = len(record) + len(image or b"")
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO places (key, record, image, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, record, image, size, now, now),
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used places until the cache fits in max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM places").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM places ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM places WHERE key = ?", (key,))
+            total -= size
+            self.evicted += 1
+        self.conn.commit()
+
+    def print_summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0
+        print(
+            f"Place cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), "
+            f"{self.expired} expired, {self.evicted} evicted"
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,83 @@
+"""Crash-safe checkpoint journal for long input.txt runs.
+
+Every extracted place and every finished search is appended to a JSON-lines
+journal and fsynced right away. With --resume, main() reads the journal back:
+finished searches are rebuilt from it without opening the browser, and a
+partially scraped search starts with its journaled places and skips them in
+the results feed.
+"""
+import json
+import os
+from dataclasses import asdict
+
+from main import Business
+
+DEFAULT_JOURNAL_PATH = os.path.join('GMaps Data', 'journal.jsonl')
+
+
+def _search_id(search_for: str) -> str:
+    return search_for.strip()
+
+
+class Journal:
+    """Append-only journal of scraped places and completed searches"""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, resume: bool = False):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.completed = set()
+        self.places = {}
+        if resume and os.path.exists(path):
+            self._load()
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            # drop a line torn by a crash mid-write so new entries start clean
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+                data = data[:data.rfind(b'\n') + 1]
+
+        for line in data.decode('utf-8').splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry["type"] == "place":
+                self.places.setdefault(entry["search"], {})[entry["key"]] = entry["business"]
+            elif entry["type"] == "search_done":
+                self.completed.add(entry["search"])
+
+    def _append(self, entry: dict):
+        self.file.write(json.dumps(entry) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def record_place(self, search_for: str, key: str, business: Business):
+        record = asdict(business)
+        self.places.setdefault(_search_id(search_for), {})[key] = record
+        self._append({"type": "place", "search": _search_id(search_for), "key": key, "business": record})
+
+    def record_search_done(self, search_for: str):
+        self.completed.add(_search_id(search_for))
+        self._append({"type": "search_done", "search": _search_id(search_for)})
+
+    def is_search_done(self, search_for: str) -> bool:
+        return _search_id(search_for) in self.completed
+
+    def has_place(self, search_for: str, key: str) -> bool:
+        return key in self.places.get(_search_id(search_for), {})
+
+    def businesses(self, search_for: str):
+        """Yield the journaled places of a search as Business objects"""
+        for _, business in self.keyed_businesses(search_for):
+            yield business
+
+    def keyed_businesses(self, search_for: str):
+        """Yield (place key, Business) for the journaled places of a search"""
+        for key, record in self.places.get(_search_id(search_for), {}).items():
+            yield key, Business(**record)
+
+    def close(self):
+        self.file.close()
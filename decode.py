@@ -1,13 +1,22 @@
-from openlocationcode import openlocationcode as olc
+import argparse
 
-# Plus code
-plus_code = "HM5W+V7" 
+from geocode import decode_plus_codes, region_reference
 
-# Harus ditambahkan area referensi (misalnya kota atau provinsi)
-area_context = "Jati, Sidoarjo Regency, East Java"
+# Decode plus codes, e.g.:
+#   python decode.py HM5W+V7 --region "Jati, Sidoarjo Regency, East Java"
+#   python decode.py --file codes.txt --region "kota Batu"
+# Short codes are recovered near the reference point of the region named in
+# --region (see geocode.REGIONS / regions.json).
+parser = argparse.ArgumentParser()
+parser.add_argument("codes", nargs="*", default=["HM5W+V7"])
+parser.add_argument("-f", "--file", type=str, help="file with one plus code per line")
+parser.add_argument("-r", "--region", type=str, default="Jati, Sidoarjo Regency, East Java")
+args = parser.parse_args()
 
-# Decode dengan asumsi di Sidoarjo
-decoded = olc.decode(olc.recoverNearest(plus_code, -7.45, 112.70))
+codes = args.codes
+if args.file:
+    with open(args.file, 'r') as file:
+        codes = [line.strip() for line in file if line.strip()]
 
-print(f"Latitude: {decoded.latitudeCenter}")
-print(f"Longitude: {decoded.longitudeCenter}")
\ No newline at end of file
+for code, (latitude, longitude) in zip(codes, decode_plus_codes(codes, region_reference(args.region))):
+    print(f"{code}\tLatitude: {latitude}\tLongitude: {longitude}")
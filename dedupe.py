@@ -0,0 +1,118 @@
+"""Run-wide place dedupe.
+
+DedupeIndex is shared by every BusinessList of a run, so a place found by two
+searches (or two tiles) is written once. Places are matched by
+
+- place key (the data id from the place href, see harvester.place_key), and
+- proximity: the same normalized name within `radius_meters`, looked up in a
+  grid of cells `radius_meters` high and twice that wide in degrees of
+  longitude, so branches of a chain in different places are kept apart. The
+  column width is the same at every latitude, so two nearby points are never
+  more than the searched columns apart: the 3x3 cells around a point up to
+  60 degrees latitude, more columns towards the poles.
+
+Both lookups are dict hits, O(1) on average however many places were seen.
+Every dropped duplicate is appended to a JSONL merge log for auditing.
+"""
+import datetime
+import json
+import math
+import re
+
+
+METERS_PER_DEGREE = 111000
+
+
+def normalize_name(name: str) -> str:
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (name or '').lower()).split())
+
+
+class DedupeIndex:
+    def __init__(self, radius_meters: float = 25, log_path: str = None):
+        self.radius = radius_meters
+        self.cell_degrees = radius_meters / METERS_PER_DEGREE if radius_meters > 0 else None
+        self.by_key = {}
+        # (row, col) -> [(lat, lng, normalized name, record id)]
+        self.grid = {}
+        self.records = []
+        self.merged = 0
+        self.log = open(log_path, 'a', encoding='utf-8') if log_path else None
+
+    def _cell(self, lat: float, lng: float) -> tuple:
+        # a fixed column width; a per-point width (cell_degrees / cos(lat))
+        # puts nearby points in columns far apart at high longitudes
+        return math.floor(lat / self.cell_degrees), math.floor(lng / (2 * self.cell_degrees))
+
+    def _column_span(self, lat: float) -> int:
+        """Columns on each side that can hold a point within the radius of `lat`"""
+        # a meter of longitude is widest in degrees at the poleward edge of the radius
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + self.cell_degrees, 90))), 0.01)
+        return math.ceil(1 / (2 * cos_lat))
+
+    def _distance(self, lat1, lng1, lat2, lng2) -> float:
+        dy = (lat2 - lat1) * METERS_PER_DEGREE
+        dx = (lng2 - lng1) * METERS_PER_DEGREE * math.cos(math.radians((lat1 + lat2) / 2))
+        return math.hypot(dx, dy)
+
+    def _nearby(self, lat: float, lng: float, name: str):
+        row, col = self._cell(lat, lng)
+        span = self._column_span(lat)
+        best = None
+        for d_row in (-1, 0, 1):
+            for d_col in range(-span, span + 1):
+                for other_lat, other_lng, other_name, record_id in self.grid.get((row + d_row, col + d_col), ()):
+                    if other_name != name:
+                        continue
+                    distance = self._distance(lat, lng, other_lat, other_lng)
+                    if distance <= self.radius and (best is None or distance < best[1]):
+                        best = (record_id, distance)
+        return best
+
+    def _log(self, business, key, search_for, record_id, reason, distance=None):
+        self.merged += 1
+        if self.log is None:
+            return
+        kept_key, kept_name, kept_search = self.records[record_id]
+        self.log.write(json.dumps({
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "reason": reason,
+            "distance_m": None if distance is None else round(distance, 1),
+            "dropped": {"name": business.name, "key": key, "search": (search_for or "").strip()},
+            "kept": {"name": kept_name, "key": kept_key, "search": kept_search},
+        }, ensure_ascii=False) + "\n")
+        self.log.flush()
+
+    def admit(self, business, key: str = None, search_for: str = None) -> bool:
+        """Register `business` and return True, or log the merge and return
+        False if it duplicates a place already admitted this run
+        """
+        if key and key in self.by_key:
+            self._log(business, key, search_for, self.by_key[key], "place_key")
+            return False
+
+        name = normalize_name(business.name)
+        located = self.cell_degrees is not None and business.latitude is not None and business.longitude is not None
+        if located and name:
+            nearby = self._nearby(business.latitude, business.longitude, name)
+            if nearby is not None:
+                record_id, distance = nearby
+                if key:
+                    self.by_key[key] = record_id
+                self._log(business, key, search_for, record_id, "nearby", distance)
+                return False
+
+        record_id = len(self.records)
+        self.records.append((key, business.name, (search_for or "").strip()))
+        if key:
+            self.by_key[key] = record_id
+        if located and name:
+            cell = self._cell(business.latitude, business.longitude)
+            self.grid.setdefault(cell, []).append((business.latitude, business.longitude, name, record_id))
+        return True
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+
+    def print_summary(self):
+        print(f"Dedupe: {len(self.records)} unique places, {self.merged} duplicates merged")
@@ -0,0 +1,71 @@
+"""Build Google Maps embed <iframe> HTML from data we already have.
+
+Replaces the Share -> Embed a map -> Copy HTML clipboard round trip: the
+`pb` parameter of the embed URL only needs the place's coordinates, its data
+id (`0x..:0x..`, found in every /maps/place/ URL) and its name.
+"""
+import re
+import time
+from urllib.parse import quote
+
+EMBED_URL = "https://www.google.com/maps/embed?pb="
+IFRAME_TEMPLATE = (
+    '<iframe src="{src}" width="{width}" height="{height}" style="border:0;" '
+    'allowfullscreen="" loading="lazy" referrerpolicy="no-referrer-when-downgrade"></iframe>'
+)
+
+DATA_ID_RE = re.compile(r'!1s(0x[0-9a-f]+(?::|%3A)0x[0-9a-f]+)', re.IGNORECASE)
+COORDINATES_RE = re.compile(r'!2d(-?[\d.]+)!3d(-?[\d.]+)')
+
+
+def data_id_from_href(href: str) -> str:
+    """The `0x..:0x..` data id embedded in a /maps/place/ or embed URL"""
+    match = DATA_ID_RE.search(href or "")
+    return match.group(1).replace('%3A', ':').replace('%3a', ':') if match else None
+
+
+def build_embed_src(latitude: float, longitude: float, name: str = None, data_id: str = None,
+                    distance: float = 3951.0, language: str = "en", region: str = "id",
+                    timestamp_ms: int = None) -> str:
+    """Embed URL centred on the coordinates, pinned to the place when its data id is known"""
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    view = (
+        f"!1m3!1d{distance}!2d{longitude}!3d{latitude}"
+        "!2m3!1f0!2f0!3f0!3m2!1i1024!2i768!4f13.1"
+    )
+    if data_id:
+        place = f"!3m3!1m2!1s{quote(data_id, safe='')}!2s{quote(name or '', safe='')}"
+        head = "!1m18!1m12"
+    else:
+        place = ""
+        head = "!1m14!1m12"
+    return (
+        f"{EMBED_URL}{head}{view}{place}!5e0"
+        f"!3m2!1s{language}!2s{region}!4v{timestamp_ms}!5m2!1s{language}!2s{region}"
+    )
+
+
+def build_embed_html(latitude: float, longitude: float, name: str = None, data_id: str = None,
+                     width: int = 600, height: int = 450, **kwargs) -> str:
+    """The same <iframe> markup Copy HTML puts on the clipboard, or None without coordinates"""
+    if latitude is None or longitude is None:
+        return None
+    src = build_embed_src(latitude, longitude, name, data_id, **kwargs)
+    return IFRAME_TEMPLATE.format(src=src, width=width, height=height)
+
+
+def embeds_match(generated: str, copied: str, precision: int = 3) -> bool:
+    """True when both embeds point at the same place (data id, else rounded coordinates)"""
+    if not generated or not copied:
+        return False
+    generated_id, copied_id = data_id_from_href(generated), data_id_from_href(copied)
+    if generated_id and copied_id:
+        return generated_id.lower() == copied_id.lower()
+    generated_at, copied_at = COORDINATES_RE.search(generated), COORDINATES_RE.search(copied)
+    if not generated_at or not copied_at:
+        return False
+    return all(
+        round(float(a), precision) == round(float(b), precision)
+        for a, b in zip(generated_at.groups(), copied_at.groups())
+    )
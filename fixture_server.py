@@ -0,0 +1,316 @@
+"""Local stand-in for the Google Maps pages the scraper reads.
+
+Serves a results feed and place panels built from recorded places (a JSON
+list, or generated ones) with the same selectors the scraper uses: the
+`searchboxinput` box, `div[role="feed"]` with /maps/place/ links that load
+more on scroll and end with "reached the end of the list", `h1.DUwDvf`, the
+address and `oloc` buttons, the "Photo of" image, the Monday hours row and
+the Share -> Embed a map -> Copy HTML dialog (closed with Escape).
+
+Every data request waits `latency_ms` (+- `jitter_ms`) so throughput can be
+measured against a realistic but repeatable network. The pages are meant to
+be served under https://www.google.com/maps through a browser route, see
+benchmark.route_to_fixture.
+
+    python fixture_server.py --port 8765 --places 300 --latency-ms 150
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+PAGE_SIZE = 20
+DESA = [
+    ("Sisir", "Batu"), ("Ngaglik", "Batu"), ("Temas", "Batu"), ("Oro-Oro Ombo", "Batu"),
+    ("Punten", "Bumiaji"), ("Tulungrejo", "Bumiaji"), ("Bulukerto", "Bumiaji"),
+    ("Beji", "Junrejo"), ("Tlekung", "Junrejo"), ("Pendem", "Junrejo"),
+]
+# 1x1 jpeg
+IMAGE_BYTES = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c1912130f"
+    "141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b08000100010101"
+    "1100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffc400b5100002010303020403050504"
+    "040000017d01020300041105122131410613516107227114328191a1082342b1c11552d1f02433627282090a161718191a2526"
+    "2728292a3435363738393a434445464748494a535455565758595a636465666768696a737475767778797a838485868788898a"
+    "92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5c6c7c8c9cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6"
+    "e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fbd3ffd9"
+)
+
+
+def generate_places(count: int, seed: int = 7) -> list[dict]:
+    """Deterministic fake places around Kota Batu"""
+    rng = random.Random(seed)
+    places = []
+    for index in range(count):
+        desa, kecamatan = DESA[index % len(DESA)]
+        lat = -7.87 + rng.uniform(-0.04, 0.04)
+        lng = 112.53 + rng.uniform(-0.04, 0.04)
+        places.append({
+            "name": f"Tempat Wisata {index + 1}",
+            "data_id": f"0x2dd7{index:012x}:0x{rng.getrandbits(60):x}",
+            "latitude": round(lat, 7),
+            "longitude": round(lng, 7),
+            "address": f"Jl. Contoh No.{index + 1}, {desa}, Kec. {kecamatan}, Kota Batu, Jawa Timur 65314",
+            "plus_code": "HG" + "23456789CFGHJMPQRVWX"[index % 20] + "J+" + "23456789CF"[index % 10] + "X",
+            "hours": "9 am to 5 pm",
+        })
+    return places
+
+
+def place_href(place: dict) -> str:
+    return (
+        f"https://www.google.com/maps/place/{quote(place['name'].replace(' ', '+'), safe='+')}/"
+        f"data=!4m7!3m6!1s{place['data_id']}!8m2!3d{place['latitude']}!4d{place['longitude']}!16s%2Fg%2F11fixture"
+    )
+
+
+APP_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Maps fixture</title>
+<style>
+body { margin: 0; font-family: sans-serif; display: flex; height: 100vh; }
+#side { width: 420px; display: flex; flex-direction: column; }
+div[role="feed"] { flex: 1; overflow-y: auto; }
+div[role="feed"] a { display: block; height: 90px; border-bottom: 1px solid #ddd; }
+#panel { flex: 1; padding: 12px; }
+div[role="dialog"] { position: fixed; top: 20%; left: 30%; background: #fff; border: 1px solid #000; padding: 20px; }
+</style></head>
+<body>
+<div id="side">
+  <input id="searchboxinput" aria-label="Search Google Maps">
+  <div role="feed" aria-label="Results"></div>
+</div>
+<div id="panel"></div>
+<script>
+// data requests stay on the page origin (routed to this server), image
+// URLs point at the server directly since they are fetched outside the page
+const DATA = "";
+const IMAGES = "__IMAGE_BASE__";
+const feed = document.querySelector('div[role="feed"]');
+const panel = document.getElementById('panel');
+let query = null, offset = 0, loading = false, done = false;
+
+async function loadMore() {
+  if (loading || done || query === null) return;
+  loading = true;
+  const response = await fetch(`${DATA}/fixture/feed?q=${encodeURIComponent(query)}&offset=${offset}`);
+  const page = await response.json();
+  for (const place of page.places) {
+    const a = document.createElement('a');
+    a.href = place.href;
+    a.setAttribute('aria-label', place.name);
+    a.dataset.index = place.index;
+    a.textContent = place.name;
+    feed.appendChild(a);
+  }
+  offset += page.places.length;
+  if (page.end) {
+    done = true;
+    const end = document.createElement('span');
+    end.textContent = "You've reached the end of the list.";
+    feed.appendChild(end);
+  }
+  loading = false;
+}
+
+function search(text) {
+  query = text; offset = 0; done = false;
+  feed.innerHTML = '';
+  loadMore();
+}
+
+document.getElementById('searchboxinput').addEventListener('keydown', (event) => {
+  if (event.key === 'Enter') search(event.target.value);
+});
+feed.addEventListener('scroll', () => {
+  if (feed.scrollTop + feed.clientHeight >= feed.scrollHeight - 200) loadMore();
+});
+
+function button(attrs, html) {
+  const b = document.createElement('button');
+  for (const [k, v] of Object.entries(attrs)) b.setAttribute(k, v);
+  b.innerHTML = html || '';
+  return b;
+}
+
+async function openPlace(url, push) {
+  const response = await fetch(url);
+  const place = await response.json();
+  if (push) history.pushState({}, '', place.href);
+  panel.innerHTML = '';
+  const h1 = document.createElement('h1');
+  h1.className = 'DUwDvf';
+  h1.textContent = place.name;
+  panel.appendChild(h1);
+  panel.appendChild(button({'aria-label': `Photo of ${place.name}`}, `<img src="${IMAGES}/img/${place.index}.jpg">`));
+  panel.appendChild(button({'aria-label': 'Share', 'class': 'g88MCb'}, 'Share'));
+  panel.appendChild(button({'data-item-id': 'address'}, `<div class="fontBodyMedium">${place.address}</div>`));
+  panel.appendChild(button({'data-item-id': 'oloc', 'class': 'CsEnBe', 'aria-label': `Plus code: ${place.plus_code} Kota Batu, Jawa Timur`}));
+  const table = document.createElement('table');
+  table.innerHTML = `<tr><td><div>Monday</div></td><td class="mxowUb" aria-label="${place.hours}">${place.hours}</td></tr>`;
+  panel.appendChild(table);
+  panel.dataset.iframe = place.iframe;
+}
+
+feed.addEventListener('click', (event) => {
+  const anchor = event.target.closest('a');
+  if (!anchor) return;
+  event.preventDefault();
+  openPlace(`${DATA}/fixture/place/${anchor.dataset.index}`, true);
+});
+
+panel.addEventListener('click', (event) => {
+  const target = event.target.closest('button');
+  if (!target || target.getAttribute('aria-label') !== 'Share') return;
+  const dialog = document.createElement('div');
+  dialog.setAttribute('role', 'dialog');
+  const embed = button({'class': 'zaxyGe', 'aria-label': 'Embed a map'}, 'Embed a map');
+  embed.addEventListener('click', () => {
+    const copy = button({'class': 'VVjj3 PpaGLb', 'aria-label': 'Copy HTML'}, 'Copy HTML');
+    copy.addEventListener('click', () => navigator.clipboard.writeText(panel.dataset.iframe));
+    dialog.appendChild(copy);
+  });
+  dialog.appendChild(embed);
+  document.body.appendChild(dialog);
+});
+
+document.addEventListener('keydown', (event) => {
+  if (event.key === 'Escape') document.querySelectorAll('div[role="dialog"]').forEach(d => d.remove());
+});
+
+// /maps/search/<query>/@lat,lng,zoom opens with the search already run
+const match = location.pathname.match(/^\\/maps\\/search\\/([^\\/]+)/);
+if (match) {
+  const text = decodeURIComponent(match[1].replace(/\\+/g, ' '));
+  document.getElementById('searchboxinput').value = text;
+  search(text);
+}
+// /maps/place/... opens the place panel, as the async engine's tabs do
+const dataId = decodeURIComponent(location.pathname).match(/!1s(0x[0-9a-f]+:0x[0-9a-f]+)/);
+if (location.pathname.startsWith('/maps/place/') && dataId) {
+  openPlace(`${DATA}/fixture/place?data_id=${encodeURIComponent(dataId[1])}`, false);
+}
+</script>
+</body></html>
+"""
+
+
+class FixtureServer:
+    """Threaded HTTP server for the fixture pages, run in the background"""
+
+    def __init__(self, places: list[dict] = None, port: int = 0, latency_ms: float = 100,
+                 jitter_ms: float = 30, page_size: int = PAGE_SIZE):
+        from embed import build_embed_html
+
+        self.places = places if places is not None else generate_places(120)
+        for index, place in enumerate(self.places):
+            place["index"] = index
+            place.setdefault("href", place_href(place))
+            place.setdefault("iframe", build_embed_html(
+                place["latitude"], place["longitude"], place["name"], place["data_id"]
+            ))
+        self.by_data_id = {place["data_id"]: place for place in self.places}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.page_size = page_size
+        self.requests = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def delay(self):
+        time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                server.requests += 1
+                url = urlsplit(self.path)
+                path = unquote(url.path)
+                if path == "/maps" or path.startswith("/maps/search/") or path.startswith("/maps/place/"):
+                    html = APP_HTML.replace("__IMAGE_BASE__", server.base_url)
+                    self.send(200, html.encode("utf-8"), "text/html; charset=utf-8")
+                elif path == "/fixture/feed":
+                    server.delay()
+                    offset = int(parse_qs(url.query).get("offset", ["0"])[0])
+                    batch = server.places[offset:offset + server.page_size]
+                    body = {
+                        "places": [{"index": p["index"], "name": p["name"], "href": p["href"]} for p in batch],
+                        "end": offset + server.page_size >= len(server.places),
+                    }
+                    self.send(200, json.dumps(body).encode("utf-8"), "application/json")
+                elif path.startswith("/fixture/place"):
+                    server.delay()
+                    if path == "/fixture/place":
+                        place = server.by_data_id.get(parse_qs(url.query).get("data_id", [""])[0])
+                    else:
+                        place = server.places[int(path.rsplit('/', 1)[1])]
+                    if place is None:
+                        self.send(404, b"unknown place", "text/plain")
+                    else:
+                        self.send(200, json.dumps(place).encode("utf-8"), "application/json")
+                elif path.startswith("/img/"):
+                    server.delay()
+                    self.send(200, IMAGE_BYTES, "image/jpeg")
+                else:
+                    self.send(404, b"not found", "text/plain")
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def load_places(path: str) -> list[dict]:
+    """Recorded places: a JSON list of {name, data_id, latitude, longitude,
+    address, plus_code, hours}
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--places", type=int, default=120, help="number of generated places")
+    parser.add_argument("--fixture", type=str, help="JSON file of recorded places instead of generated ones")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    places = load_places(args.fixture) if args.fixture else generate_places(args.places)
+    server = FixtureServer(places, args.port, args.latency_ms, args.jitter_ms)
+    print(f"Serving {len(server.places)} places on {server.base_url}/maps")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Indonesian administrative-region gazetteer (kota/kecamatan/desa codes).
+
+Loads data/wilayah.csv once and indexes it by normalized name and parent
+region. resolve_address() turns a Maps address into kecamatan and desa in one
+pass: the "..., <desa>, Kec. <kecamatan>" form is read with precompiled
+patterns. Addresses without it fall back to whole comma-separated segments,
+so street names ("Jl. Sumberejo") are not read as regions. Either way only
+regions of a kota named in the address get a code, so a kecamatan of another
+kota or kabupaten is never matched to a namesake (or near namesake) in the
+data. Spelling variants are resolved through a precomputed single-deletion
+index instead of scanning all names.
+
+Add regions by appending rows to data/wilayah.csv (kode, induk, tingkat, nama).
+"""
+import csv
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'wilayah.csv')
+
+KEC_RE = re.compile(r'kec\.\s*([^,]+)', re.IGNORECASE)
+# Example: "..., Sisir, Kec. Batu..." -> captures "Sisir"
+DESA_RE = re.compile(r',\s*([^,]+?)\s*,\s*Kec\.', re.IGNORECASE)
+PREFIX_RE = re.compile(r'^(kecamatan|kec\.?|desa|kelurahan|kel\.?)\s+')
+
+
+def normalize(name: str) -> str:
+    """Lowercase, '-' as space, no kec./desa/kel. prefix, single spaces"""
+    name = ' '.join(name.lower().replace('-', ' ').split())
+    return PREFIX_RE.sub('', name)
+
+
+def _deletes(name: str) -> set:
+    return {name[:i] + name[i + 1:] for i in range(len(name))}
+
+
+@dataclass(frozen=True)
+class Region:
+    code: str
+    parent: str
+    level: str
+    name: str
+
+
+@dataclass
+class Resolved:
+    kecamatan: str = None
+    kecamatan_id: str = None
+    desa: str = None
+    desa_id: str = None
+
+
+class Gazetteer:
+    def __init__(self, path: str = DATA_PATH):
+        self.by_code = {}
+        self.by_name = {}
+        self.fuzzy_index = {}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                region = Region(row["kode"], row["induk"], row["tingkat"], row["nama"])
+                self.by_code[region.code] = region
+                key = normalize(region.name)
+                self.by_name.setdefault((region.level, key), []).append(region)
+                for variant in _deletes(key) | {key}:
+                    self.fuzzy_index.setdefault((region.level, variant), set()).add(key)
+
+        kotas = sorted({key for level, key in self.by_name if level == "kota"}, key=len, reverse=True)
+        self.kota_matcher = re.compile(r'\b(' + '|'.join(re.escape(name) for name in kotas) + r')\b')
+
+    def _kota_of(self, region: Region) -> str:
+        while region is not None and region.level != "kota":
+            region = self.by_code.get(region.parent)
+        return region.code if region else None
+
+    def _pick(self, regions: list, parent: str = None):
+        if parent:
+            for region in regions:
+                if region.parent == parent:
+                    return region
+        return regions[0] if regions else None
+
+    def lookup(self, level: str, name: str, parent: str = None, kotas: set = None) -> Region:
+        """Region of `level` named `name`, preferring children of `parent`,
+        with a one-edit fuzzy fallback. With `kotas`, only regions inside
+        those kota codes are considered.
+        """
+        if not name:
+            return None
+        key = normalize(name)
+
+        def in_scope(regions):
+            return [region for region in regions if kotas is None or self._kota_of(region) in kotas]
+
+        regions = in_scope(self.by_name.get((level, key), []))
+        if regions:
+            return self._pick(regions, parent)
+
+        candidates = set()
+        for variant in _deletes(key) | {key}:
+            candidates |= self.fuzzy_index.get((level, variant), set())
+        regions = in_scope([region for candidate in sorted(candidates) for region in self.by_name[(level, candidate)]])
+        return self._pick(regions, parent)
+
+    def resolve_address(self, address: str) -> Resolved:
+        """Kecamatan and desa (names as written in the address, plus their codes).
+
+        Codes only come from kotas the address names, and a desa only counts
+        when it lies in the kecamatan the address names (if it names one).
+        """
+        resolved = Resolved()
+        if not address:
+            return resolved
+
+        if kec_match := KEC_RE.search(address):
+            resolved.kecamatan = kec_match.group(1).strip()
+        if desa_match := DESA_RE.search(address):
+            resolved.desa = desa_match.group(1).strip()
+
+        kotas = {region.code for match in self.kota_matcher.finditer(normalize(address))
+                 for region in self.by_name[("kota", match.group(1))]}
+        kecamatan = self.lookup("kecamatan", resolved.kecamatan, kotas=kotas)
+        desa = self.lookup("desa", resolved.desa, kecamatan.code if kecamatan else None, kotas)
+
+        if kecamatan is None or desa is None:
+            # no "Desa, Kec. X" form: only whole address segments count
+            kec_hits, desa_hits = [], []
+            for segment in (normalize(part) for part in address.split(',')):
+                kec_hits += [r for r in self.by_name.get(("kecamatan", segment), []) if self._kota_of(r) in kotas]
+                desa_hits += [r for r in self.by_name.get(("desa", segment), []) if self._kota_of(r) in kotas]
+            if desa is None and desa_hits:
+                desa = self._pick(desa_hits, kecamatan.code if kecamatan else None)
+                resolved.desa = resolved.desa or desa.name
+            # a kecamatan the address names is never replaced by one derived from the desa
+            if kecamatan is None and resolved.kecamatan is None:
+                kecamatan = self.by_code.get(desa.parent) if desa else (kec_hits[0] if kec_hits else None)
+                if kecamatan is not None:
+                    resolved.kecamatan = kecamatan.name
+
+        if desa is not None and (kecamatan is None or desa.parent != kecamatan.code):
+            desa = None
+        resolved.kecamatan_id = kecamatan.code if kecamatan else None
+        resolved.desa_id = desa.code if desa else None
+        return resolved
+
+
+@lru_cache(maxsize=1)
+def default_gazetteer() -> Gazetteer:
+    return Gazetteer()
+
+
+def resolve_address(address: str) -> Resolved:
+    return default_gazetteer().resolve_address(address)
@@ -0,0 +1,106 @@
+"""Plus-code geocoding with per-region reference points.
+
+Short plus codes (e.g. "HM5W+V7") can only be recovered relative to a nearby
+reference point. The reference is picked per search region from REGIONS
+(extended by regions.json) by matching region names in the search query or the
+plus-code label, instead of always using Kota Batu.
+
+decode_plus_codes() decodes many codes at once: duplicates are decoded once
+through an LRU memo and the rounding is done on the whole NumPy array.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+from openlocationcode import openlocationcode as olc
+
+REGIONS_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'regions.json')
+DEFAULT_REGION = "kota batu"
+METERS_PER_DEGREE = 111000
+
+# region name (lowercase) -> reference (latitude, longitude)
+REGIONS = {
+    "kota batu": (-7.883063867394289, 112.53430108928096),
+    "sidoarjo": (-7.45, 112.70),
+}
+
+
+def calculate_delta(lat, distance_meters):
+    """Degrees of latitude and longitude spanning `distance_meters` at `lat`
+    (scalars or NumPy arrays)
+    """
+    lat_deg = distance_meters / METERS_PER_DEGREE
+    lon_deg = distance_meters / (METERS_PER_DEGREE * np.cos(np.radians(lat)))
+    return lat_deg, lon_deg
+
+
+def load_regions(path: str = REGIONS_CONFIG):
+    """Add or override reference points from a {"name": [lat, lng]} json file"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for name, (lat, lng) in json.load(f).items():
+            REGIONS[name.lower().strip()] = (float(lat), float(lng))
+    _region_pattern.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _region_pattern():
+    names = sorted(REGIONS, key=len, reverse=True)
+    return re.compile(r'\b(' + '|'.join(re.escape(name) for name in names) + r')\b', re.IGNORECASE)
+
+
+def region_reference(*texts: str) -> tuple:
+    """Reference point of the first known region named in `texts` (search query,
+    plus-code label, address), else the default region
+    """
+    for text in texts:
+        if text and (match := _region_pattern().search(text)):
+            return REGIONS[match.group(1).lower()]
+    return REGIONS[DEFAULT_REGION]
+
+
+@lru_cache(maxsize=262144)
+def _decode(code: str, ref_lat: float, ref_lng: float) -> tuple:
+    """(lat, lng) centre of a plus code, NaN for codes that cannot be decoded"""
+    try:
+        if olc.isShort(code):
+            code = olc.recoverNearest(code, ref_lat, ref_lng)
+        area = olc.decode(code)
+        return area.latitudeCenter, area.longitudeCenter
+    except Exception:
+        return float('nan'), float('nan')
+
+
+def _clean(plus_code: str) -> str:
+    # "HM5W+V7 Jati, Sidoarjo" -> "HM5W+V7"
+    return (plus_code or '').strip().split(' ')[0].upper()
+
+
+def decode_plus_codes(plus_codes, reference: tuple = None) -> np.ndarray:
+    """Decode many plus codes against one reference point.
+
+    Returns an (n, 2) float array of latitude/longitude rounded to 10 decimals,
+    NaN rows for invalid codes.
+    """
+    reference = reference or REGIONS[DEFAULT_REGION]
+    codes = np.asarray([_clean(code) for code in plus_codes], dtype=object)
+    if codes.size == 0:
+        return np.empty((0, 2))
+    unique_codes, inverse = np.unique(codes, return_inverse=True)
+    decoded = np.array([_decode(code, reference[0], reference[1]) for code in unique_codes], dtype=float)
+    return np.round(decoded[inverse], 10)
+
+
+def extract_latlng(plus_code: str, reference: tuple = None) -> tuple:
+    """(latitude, longitude) of one plus code, (None, None) if it cannot be decoded"""
+    reference = reference or REGIONS[DEFAULT_REGION]
+    lat, lng = _decode(_clean(plus_code), reference[0], reference[1])
+    if np.isnan(lat):
+        return None, None
+    return round(lat, 10), round(lng, 10)
+
+
+load_regions()
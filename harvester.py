@@ -0,0 +1,121 @@
+"""Streaming results-feed harvester.
+
+harvest_place_hrefs() is a generator: it yields every place href as soon as
+it appears in the feed (deduped by place data id) and only scrolls once the
+consumer has taken all hrefs already loaded, so extraction of the first
+results starts while the rest of the feed is still being loaded.
+
+Each round costs one page.evaluate (all hrefs plus the end-of-list marker)
+instead of re-counting the feed links several times.
+"""
+from urllib.parse import quote_plus
+
+import profiling
+import readiness
+from embed import data_id_from_href
+
+MAPS_SEARCH_URL = "https://www.google.com/maps/search/"
+
+FEED_STATE_JS = """
+(withCards) => {
+    const links = Array.from(document.querySelectorAll('a[href*="https://www.google.com/maps/place"]'));
+    return {
+        hrefs: links.map(a => a.href),
+        // text of each result card (name, rating, category, address, hours line)
+        cards: withCards ? links.map(a => (a.closest('div.Nv2PK') || a).innerText) : null,
+        end: !!document.evaluate(
+            '//span[contains(text(), "reached the end of the list")]',
+            document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue,
+    };
+}
+"""
+
+SCROLL_FEED_JS = """
+() => {
+    const feed = document.querySelector('div[role="feed"]');
+    if (!feed) return false;
+    feed.scrollBy(0, 10000);
+    return true;
+}
+"""
+
+
+def place_key(href: str) -> str:
+    """Dedupe key of a place href: its data id, else the URL without query"""
+    return data_id_from_href(href) or href.split('?')[0]
+
+
+def search_url(search_for: str) -> str:
+    """Direct URL of a search's results, so nothing has to be typed"""
+    return MAPS_SEARCH_URL + quote_plus(search_for.strip())
+
+
+def start_search(page, search_for: str, preloaded: bool = False):
+    """Open the search by URL (unless `page` was preloaded with it) and wait for the results feed"""
+    with profiling.stage("search"):
+        if not preloaded:
+            page.goto(search_url(search_for), timeout=20000)
+        readiness.wait_for_search_results(page)
+
+
+def scroll_feed(page):
+    """Scroll the results feed itself, falling back to the mouse wheel"""
+    if not page.evaluate(SCROLL_FEED_JS):
+        page.hover('//a[contains(@href, "https://www.google.com/maps/place")]')
+        page.mouse.wheel(0, 10000)
+
+
+def harvest_place_hrefs(page, total: int, patience: int = 3, log_prefix: str = "", cards: dict = None,
+                        status: dict = None):
+    """Yield new place hrefs from the results feed of the current search.
+
+    Stops after `total` places, when Maps shows the end-of-list marker, or
+    after `patience` consecutive scrolls that load nothing new (one empty
+    scroll is often just a slow network response). With a `cards` dict, the
+    text of each href's result card is stored in it before the href is yielded.
+    With a `status` dict, status["end"] is set to whether the end-of-list
+    marker was reached, i.e. whether the whole feed was read.
+    """
+    if status is not None:
+        status["end"] = False
+    seen = set()
+    stale_rounds = 0
+    while len(seen) < total:
+        state = page.evaluate(FEED_STATE_JS, cards is not None)
+        fresh = 0
+        for index, href in enumerate(state["hrefs"]):
+            key = place_key(href)
+            if key in seen:
+                continue
+            seen.add(key)
+            fresh += 1
+            if cards is not None:
+                cards[href] = state["cards"][index]
+            yield href
+            if len(seen) >= total:
+                print(f"{log_prefix}Total Scraped: {len(seen)}")
+                return
+
+        if state["end"]:
+            if status is not None:
+                status["end"] = True
+            print(f"{log_prefix}Arrived at all available\n{log_prefix}Total Scraped: {len(seen)}")
+            return
+        stale_rounds = 0 if fresh else stale_rounds + 1
+        if stale_rounds >= patience:
+            print(f"{log_prefix}No new results after {patience} scrolls\n{log_prefix}Total Scraped: {len(seen)}")
+            return
+        print(f"{log_prefix}Currently Scraped: ", len(seen), end='\r')
+
+        with profiling.stage("scroll"):
+            scroll_feed(page)
+            readiness.wait_for_feed_growth(page, len(state["hrefs"]))
+
+    print(f"{log_prefix}Total Scraped: {len(seen)}")
+
+
+def listing_for_href(page, href: str):
+    """Locator of the feed anchor for `href`"""
+    escaped = href.replace('\\', '\\\\').replace('"', '\\"')
+    return page.locator(f'a[href="{escaped}"]').first
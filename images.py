@@ -0,0 +1,175 @@
+"""Background image download pipeline.
+
+ImageDownloader takes image URLs from the scraping thread and fetches them on
+a small thread pool, so extraction never waits on image I/O. Each thread keeps
+its HTTPS connections open and reuses them per host, images are stored once
+under their content hash, a URL is never fetched twice (unless it failed),
+and a name index (images/index.csv) maps business names to the stored files.
+
+name_image and size_image are filled on the Business as soon as its file is
+written; wait_for()/wait_all() block only when a record is about to be saved.
+"""
+import csv
+import hashlib
+import http.client
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import profiling
+
+
+def sanitize_name(name: str) -> str:
+    sanitized_name = "".join([c for c in name if c.isalnum() or c in (' ', '-', '_')]).rstrip()
+    return sanitized_name.replace('/', '_').replace('\\', '_')
+
+
+class ImageDownloader:
+    """Thread pool downloader with a bounded queue and content-hash storage"""
+
+    def __init__(self, images_dir: str, threads: int = 4, queue_size: int = 64, timeout: float = 20):
+        os.makedirs(images_dir, exist_ok=True)
+        self.images_dir = images_dir
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="image")
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.by_url = {}
+        self.pending = {}
+        self.downloaded = 0
+        self.reused = 0
+        self.failed = 0
+
+        index_path = os.path.join(images_dir, 'index.csv')
+        if os.path.exists(index_path):
+            with open(index_path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    done = Future()
+                    done.set_result((row["file"], int(row["bytes"])))
+                    self.by_url[row["url"]] = done
+        self.index_file = open(index_path, 'a', newline='', encoding='utf-8')
+        self.index = csv.DictWriter(self.index_file, fieldnames=["name", "file", "bytes", "url"])
+        if self.index_file.tell() == 0:
+            self.index.writeheader()
+
+    def _connection(self, scheme: str, host: str):
+        connections = getattr(self.local, "connections", None)
+        if connections is None:
+            connections = self.local.connections = {}
+        if (scheme, host) not in connections:
+            connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            connections[(scheme, host)] = connection_class(host, timeout=self.timeout)
+        return connections[(scheme, host)]
+
+    def _get(self, url: str, redirects: int = 3) -> bytes:
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            connection = self._connection(parts.scheme, parts.netloc)
+            try:
+                connection.request("GET", path or "/", headers={"User-Agent": "Mozilla/5.0"})
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # the pooled connection was closed by the server, reconnect once
+                connection.close()
+                del self.local.connections[(parts.scheme, parts.netloc)]
+                if attempt:
+                    raise
+        if response.status in (301, 302, 303, 307, 308) and redirects:
+            return self._get(urljoin(url, response.getheader("Location")), redirects - 1)
+        if response.status != 200:
+            raise OSError(f"HTTP {response.status} for {url}")
+        return body
+
+    def _write(self, body: bytes):
+        file_name = f"{hashlib.sha1(body).hexdigest()[:20]}.jpg"
+        file_path = os.path.join(self.images_dir, file_name)
+        if not os.path.exists(file_path):
+            with open(file_path, 'wb') as f:
+                f.write(body)
+        return file_name, len(body)
+
+    def _fetch(self, url: str):
+        with profiling.stage("image"):
+            return self._write(self._get(url))
+
+    def store(self, business, body: bytes):
+        """Store image bytes fetched elsewhere (e.g. from the place cache)"""
+        file_name, size = self._write(body)
+        size_number = round(size / 1024, 2)
+        business.size_image = f"{int(size_number * 100)}"  # 64.92 becomes 6492
+        business.name_image = file_name
+
+    def submit(self, url: str, business):
+        """Queue the image of `business`; blocks only while the queue is full"""
+        with self.lock:
+            job = self.by_url.get(url)
+            reused = job is not None
+        if job is None:
+            self.slots.acquire()
+            job = self.executor.submit(self._fetch, url)
+            job.add_done_callback(lambda _: self.slots.release())
+            with self.lock:
+                self.by_url[url] = job
+
+        done = Future()
+        with self.lock:
+            self.pending[id(business)] = done
+
+        def fill(job):
+            try:
+                file_name, size = job.result()
+                size_number = round(size / 1024, 2)
+                business.size_image = f"{int(size_number * 100)}"  # 64.92 becomes 6492
+                business.name_image = file_name
+                with self.lock:
+                    if reused:
+                        self.reused += 1
+                    else:
+                        self.downloaded += 1
+                    self.index.writerow({
+                        "name": sanitize_name(business.name or ""), "file": file_name, "bytes": size, "url": url,
+                    })
+                    self.index_file.flush()
+            except Exception as e:
+                with self.lock:
+                    self.failed += 1
+                    # let a later submit of the same URL try again
+                    if self.by_url.get(url) is job:
+                        del self.by_url[url]
+                print(f"Error saving image: {e}")
+            done.set_result(None)
+
+        job.add_done_callback(fill)
+
+    def is_done(self, business) -> bool:
+        """Whether the image of `business` (if any) has been written, without blocking"""
+        with self.lock:
+            done = self.pending.get(id(business))
+        return done is None or done.done()
+
+    def wait_for(self, business):
+        """Block until the image of `business` (if any) has been written"""
+        with self.lock:
+            done = self.pending.pop(id(business), None)
+        if done is not None:
+            done.result()
+
+    def wait_all(self):
+        with self.lock:
+            pending = list(self.pending.values())
+            self.pending.clear()
+        for done in pending:
+            done.result()
+
+    def close(self):
+        self.wait_all()
+        self.executor.shutdown(wait=True)
+        self.index_file.close()
+
+    def print_summary(self):
+        print(f"Images: {self.downloaded} downloaded, {self.reused} reused, {self.failed} failed")
@@ -0,0 +1,138 @@
+"""Bounding-box (kotak) corner points for scraped places.
+
+Stage after scraping, promoted from kotak.ipynb: for every row with a
+latitude/longitude it writes the four corners of a square `--radius` meters
+from the point, in the order (+lat, +lng), (+lat, -lng), (-lat, -lng),
+(-lat, +lng).
+
+Inputs are read in chunks (csv, jsonl and parquet through pandas/pyarrow
+batches, xlsx through a read-only openpyxl workbook), the corners of a whole
+chunk are computed at once with NumPy and written column-wise to the output
+before the next chunk is read. Pass a file, or a `GMaps Data/<date>/` folder
+to process every search output in it (one file per search, whichever format
+exists):
+
+    python kotak.py "data pariwisata batas.xlsx" -o hasil_koordinat_kotak.xlsx
+    python kotak.py "GMaps Data/2025-06-01" -o kotak.csv --radius 25
+"""
+import argparse
+import os
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from geocode import calculate_delta
+from writers import FORMAT_CLASSES
+
+OUTPUT_COLUMNS = ["id_pariwisata", "latitude", "longitude"]
+# when a search was saved in several formats, read the fastest one
+READ_PREFERENCE = (".parquet", ".csv", ".jsonl", ".xlsx")
+
+
+def read_chunks(path: str, chunk_size: int):
+    """Yield DataFrame chunks of a csv, jsonl, parquet or xlsx file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif extension == ".jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    elif extension == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif extension == ".xlsx":
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = next(rows, None)
+            while headers and (chunk := list(islice(rows, chunk_size))):
+                yield pd.DataFrame(chunk, columns=headers)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported input: {path}")
+
+
+def input_files(path: str) -> list[str]:
+    """`path` itself, or one output file per search in a GMaps Data folder"""
+    if not os.path.isdir(path):
+        return [path]
+    by_search = {}
+    for name in sorted(os.listdir(path)):
+        stem, extension = os.path.splitext(name)
+        if extension.lower() not in READ_PREFERENCE or stem == "dedupe_log":
+            continue
+        current = by_search.get(stem)
+        if current is None or READ_PREFERENCE.index(extension.lower()) < READ_PREFERENCE.index(current[1]):
+            by_search[stem] = (name, extension.lower())
+    return [os.path.join(path, name) for name, _ in by_search.values()]
+
+
+def corner_points(ids: np.ndarray, lat: np.ndarray, lng: np.ndarray, radius_meters: float) -> dict:
+    """Four corners per point, as columns of 4 * n rows"""
+    delta_lat, delta_lng = calculate_delta(lat, radius_meters)
+    corner_lat = lat[:, None] + np.array([1, 1, -1, -1]) * delta_lat
+    corner_lng = lng[:, None] + np.array([1, -1, -1, 1]) * delta_lng[:, None]
+    return {
+        "id_pariwisata": np.repeat(ids, 4),
+        "latitude": corner_lat.ravel(),
+        "longitude": corner_lng.ravel(),
+    }
+
+
+def id_column_of(chunk: pd.DataFrame, id_column: str = None) -> str:
+    if id_column:
+        return id_column
+    return "id" if "id" in chunk.columns else "name"
+
+
+def generate(inputs: list[str], output: str, radius_meters: float = 10, id_column: str = None,
+             chunk_size: int = 50_000) -> int:
+    """Write the corner points of every input row to `output`, chunk by chunk"""
+    extension = os.path.splitext(output)[1].lower().lstrip('.')
+    if extension not in FORMAT_CLASSES:
+        raise ValueError(f"Unknown output format: {output}")
+    if extension == "parquet":
+        writer = FORMAT_CLASSES[extension](output, OUTPUT_COLUMNS, {"id_pariwisata": str, "latitude": float, "longitude": float})
+    else:
+        writer = FORMAT_CLASSES[extension](output, OUTPUT_COLUMNS)
+
+    written = 0
+    try:
+        for path in inputs:
+            for chunk in read_chunks(path, chunk_size):
+                if "latitude" not in chunk.columns or "longitude" not in chunk.columns:
+                    print(f"Skipping {path}: no latitude/longitude columns")
+                    break
+                lat = pd.to_numeric(chunk["latitude"], errors="coerce").to_numpy(dtype=float)
+                lng = pd.to_numeric(chunk["longitude"], errors="coerce").to_numpy(dtype=float)
+                located = ~(np.isnan(lat) | np.isnan(lng))
+                ids = chunk[id_column_of(chunk, id_column)].to_numpy(dtype=object)[located]
+                columns = corner_points(ids, lat[located], lng[located], radius_meters)
+                writer.write_columns(columns)
+                written += len(columns["latitude"])
+            print(f"{path}: {written} points so far")
+    finally:
+        writer.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", nargs="?", default="data pariwisata batas.xlsx",
+                        help="csv/jsonl/parquet/xlsx file, or a GMaps Data/<date> folder")
+    parser.add_argument("-o", "--output", type=str, default="hasil_koordinat_kotak.xlsx",
+                        help="output file, format from the extension (csv, jsonl, parquet, xlsx)")
+    parser.add_argument("-r", "--radius", type=float, default=10, help="meters from the point to each side")
+    parser.add_argument("--id-column", type=str, help="id column of the input (default: id, else name)")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    written = generate(input_files(args.input), args.output, args.radius, args.id_column, args.chunk_size)
+    print(f"Export berhasil! {written} points -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Lean browser profile: headless Chromium that skips what extraction never uses.
+
+Map tiles, satellite imagery, street-view thumbnails, fonts, media and
+analytics beacons are aborted through context.route. DOM attributes (such as
+the place photo `src` read by panel_extract) are unaffected, and the image
+itself is fetched outside the page (ImageDownloader or page.request), which
+the route rules do not touch.
+
+BandwidthMeter counts requests and transferred bytes per search so runs with
+and without the lean profile can be compared.
+"""
+import time
+from dataclasses import dataclass, field
+
+BLOCKED_RESOURCE_TYPES = {"font", "media"}
+BLOCKED_URL_PARTS = (
+    "/maps/vt",                 # vector/raster map tiles
+    "/kh/v=", "khms", "/maps/sv", "streetviewpixels", "/cbk?",  # imagery, street view
+    "fonts.gstatic.com", "fonts.googleapis.com",
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "/gen_204", "/log?", "/csi?",   # logging beacons
+)
+
+
+def is_blocked(url: str, resource_type: str) -> bool:
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    return any(part in url for part in BLOCKED_URL_PARTS)
+
+
+@dataclass
+class BandwidthMeter:
+    """Per-search request and byte counters for a browser context"""
+    requests: int = 0
+    bytes: int = 0
+    blocked: int = 0
+    searches: list = field(default_factory=list)
+    _search: str = None
+    _started: float = 0.0
+    _mark: tuple = (0, 0, 0)
+
+    def on_request_finished(self, request):
+        self.requests += 1
+        try:
+            sizes = request.sizes()
+            self.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:
+            pass
+
+    def start(self, search_for: str):
+        self._search = search_for.strip()
+        self._started = time.perf_counter()
+        self._mark = (self.requests, self.bytes, self.blocked)
+
+    def stop(self, log_prefix: str = ""):
+        requests, transferred, blocked = (
+            self.requests - self._mark[0], self.bytes - self._mark[1], self.blocked - self._mark[2]
+        )
+        seconds = time.perf_counter() - self._started
+        self.searches.append((self._search, requests, transferred, blocked, seconds))
+        print(
+            f"{log_prefix}Bandwidth: {transferred / 1_048_576:.1f} MB in {requests} requests, "
+            f"{blocked} blocked, {seconds:.0f}s"
+        )
+
+    def print_summary(self):
+        if not self.searches:
+            return
+        print("-----\nBandwidth per search:")
+        for search, requests, transferred, blocked, seconds in self.searches:
+            print(f"  {search}: {transferred / 1_048_576:.1f} MB, {requests} requests, {blocked} blocked, {seconds:.0f}s")
+        print(f"  total: {self.bytes / 1_048_576:.1f} MB, {self.requests} requests, {self.blocked} blocked")
+
+
+def apply_lean_profile(context, meter: BandwidthMeter = None, block: bool = True):
+    """Install the blocking rules (and the meter) on a browser context"""
+    if block:
+        def route(route):
+            request = route.request
+            if is_blocked(request.url, request.resource_type):
+                if meter is not None:
+                    meter.blocked += 1
+                route.abort()
+            else:
+                route.continue_()
+        context.route("**/*", route)
+    if meter is not None:
+        context.on("requestfinished", meter.on_request_finished)
+
+
+def launch_context(playwright, lean: bool = False, meter: BandwidthMeter = None, headless: bool = False,
+                   executable_path: str = None, storage_state: str = None, user_data_dir: str = None):
+    """Launch Chromium and return (browser, context); `lean` forces headless and blocking.
+
+    The context starts from a saved `storage_state` file, or with `user_data_dir`
+    is a persistent profile; a persistent context is also returned as the
+    browser, since closing it closes Chromium.
+    """
+    if user_data_dir:
+        context = playwright.chromium.launch_persistent_context(
+            user_data_dir, headless=headless or lean, executable_path=executable_path, locale="en-GB"
+        )
+        browser = context
+    else:
+        browser = playwright.chromium.launch(headless=headless or lean, executable_path=executable_path)
+        context = browser.new_context(locale="en-GB", storage_state=storage_state)
+    # Copy HTML (--verify-embed) reads the clipboard, which headless denies by default
+    context.grant_permissions(["clipboard-read", "clipboard-write"], origin="https://www.google.com")
+    if lean or meter is not None:
+        apply_lean_profile(context, meter, block=lean)
+    return browser, context
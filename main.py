@@ -5,9 +5,17 @@ import pandas as pd
 import argparse
 import os
 import sys
-from openlocationcode import openlocationcode as olc
 import random
 import re
+import readiness
+import profiling
+import time
+from harvester import harvest_place_hrefs, listing_for_href, place_key, start_search
+from embed import data_id_from_href, embeds_match
+from lean import BandwidthMeter, launch_context
+from geocode import extract_latlng, region_reference
+from ratecontrol import RateController, ThrottledError, is_blocked_page
+from gazetteer import DESA_RE, default_gazetteer, resolve_address
 
 @dataclass
 class Business:
@@ -46,12 +54,14 @@ class Business:
         """Make Business hashable for duplicate detection.
         Consider businesses different if:
         - Name is different, OR
-        - Same name but different non-empty contact info (domain/website/phone)
+        - Same name but different non-empty location (plus code/address),
+          so branches of a chain are kept apart
         """
         # Create a tuple of fields that must match for duplicates
-        # We'll include name plus any non-empty contact info fields
+        # We'll include name plus any non-empty location fields
         hash_fields = [self.name]
-        # Only include contact info fields if they're not empty
+        # Only include location fields if they're not empty
+        hash_fields += [value for value in (self.plus_code, self.address) if value]
         return hash(tuple(hash_fields))
     
     def assign_random_luas_wilayah(self):
@@ -67,46 +77,76 @@ class Business:
 class BusinessList:
     """holds list of Business objects,
     and save to both excel and csv
+
+    With a writers.StreamWriter, businesses are streamed to disk as they are
+    added instead of being kept in business_list. With an
+    images.ImageDownloader, images are downloaded in the background. With a
+    dedupe.DedupeIndex shared by the run, places already added by another
+    search are dropped.
     """
     business_list: list[Business] = field(default_factory=list)
+    writer: object = None
+    downloader: object = None
+    dedupe: object = None
+    search_for: str = None
     _seen_businesses: set = field(default_factory=set, init=False)
+    first_record_at: float = field(default=None, init=False)
     today = datetime.datetime.now().strftime("%Y-%m-%d")
     save_at = os.path.join('GMaps Data', today)
     os.makedirs(save_at, exist_ok=True)
 
-    def add_business(self, business: Business):
-        """Add a business to the list if it's not a duplicate based on key attributes"""
+    def add_business(self, business: Business, key: str = None):
+        """Add a business to the list if it's not a duplicate based on key attributes
+        (and, with a run-wide dedupe index, its place key and location)
+        """
         business_hash = hash(business)
-        if business_hash not in self._seen_businesses:
-            self.business_list.append(business)
+        if business_hash in self._seen_businesses:
+            return
+        if self.dedupe is None or self.dedupe.admit(business, key, self.search_for):
+            if self.writer is not None:
+                self.writer.write(business)
+            else:
+                self.business_list.append(business)
             self._seen_businesses.add(business_hash)
+            if self.first_record_at is None:
+                self.first_record_at = time.perf_counter()
+
+    def __len__(self):
+        return len(self._seen_businesses)
 
-    def download_image(self, page, business):
-        """Download and save business image if available"""
+    def save_image_url(self, page, business, image_url: str):
+        """Download `image_url` (in the background with a downloader) and save it for business"""
         try:
-            image_locator = page.locator('//button[contains(@aria-label, "Photo of")]/img')
-            if image_locator.count() > 0:
-                image_url = image_locator.first.get_attribute('src')
-                if image_url and business.name:
-                    sanitized_name = "".join([c for c in business.name if c.isalnum() or c in (' ', '-', '_')]).rstrip()
-                    sanitized_name = sanitized_name.replace('/', '_').replace('\\', '_')
-                    images_dir = os.path.join(self.save_at, 'images')
-                    os.makedirs(images_dir, exist_ok=True)
-                    
+            if image_url and business.name and self.downloader is not None:
+                self.downloader.submit(image_url, business)
+            elif image_url and business.name:
+                with profiling.stage("image"):
                     response = page.request.get(image_url)
                     if response.ok:
-                        file_path = os.path.join(images_dir, f"{sanitized_name}.jpg")
-                        with open(file_path, 'wb') as f:
-                            f.write(response.body())
-                        
-                        # Add these lines to store image info
-                        file_size = os.path.getsize(file_path)
-                        size_number = round(file_size/1024, 2)
-                        business.size_image = f"{int(size_number * 100)}"  # 64.92 becomes 6492
-                        business.name_image = f"{sanitized_name}.jpg"
+                        self.save_image(business, response.body())
         except Exception as e:
             print(f"Error saving image: {e}")
 
+    def save_image(self, business, body: bytes):
+        """Write downloaded image bytes and store image info on the business"""
+        if self.downloader is not None:
+            self.downloader.store(business, body)
+            return
+        sanitized_name = "".join([c for c in business.name if c.isalnum() or c in (' ', '-', '_')]).rstrip()
+        sanitized_name = sanitized_name.replace('/', '_').replace('\\', '_')
+        images_dir = os.path.join(self.save_at, 'images')
+        os.makedirs(images_dir, exist_ok=True)
+
+        file_path = os.path.join(images_dir, f"{sanitized_name}.jpg")
+        with open(file_path, 'wb') as f:
+            f.write(body)
+
+        # Add these lines to store image info
+        file_size = os.path.getsize(file_path)
+        size_number = round(file_size/1024, 2)
+        business.size_image = f"{int(size_number * 100)}"  # 64.92 becomes 6492
+        business.name_image = f"{sanitized_name}.jpg"
+
     def dataframe(self):
         """transform business_list to pandas dataframe
 
@@ -132,22 +172,31 @@ class BusinessList:
         """
         self.dataframe().to_csv(f"{self.save_at}/{filename}.csv", index=False)
 
-def extract_latlng_from_plus_code(plus_code: str):
+    def save(self, filename):
+        """closes the stream writer, or saves excel and csv from a single dataframe
+
+        Args:
+            filename (str): filename
+        """
+        if self.writer is not None:
+            self.writer.close()
+            return
+        if self.downloader is not None:
+            self.downloader.wait_all()
+        df = self.dataframe()
+        df.to_excel(f"{self.save_at}/{filename}.xlsx", index=False)
+        df.to_csv(f"{self.save_at}/{filename}.csv", index=False)
+
+def extract_latlng_from_plus_code(plus_code: str, reference: tuple = None):
     """
     Extract latitude and longitude from a plus code string.
+    Short codes are recovered near `reference` (see geocode.region_reference).
     Returns (latitude, longitude) tuple or (None, None) if invalid.
     """
-    try:
-        code = plus_code.split(' ')[0].strip()
-        # Jika code terlalu pendek (short code), tidak bisa didecode tanpa area
-        decoded = olc.decode(olc.recoverNearest(code, -7.883063867394289, 112.53430108928096))
-        # Convert to string and replace commas with periods before converting to float
-        lat = float(f"{decoded.latitudeCenter:.10f}".replace(',', '.'))
-        lng = float(f"{decoded.longitudeCenter:.10f}".replace(',', '.'))
-        return lat, lng
-    except Exception as e:
-        print(f"Decode error: {e}")
-        return None, None
+    lat, lng = extract_latlng(plus_code, reference)
+    if lat is None:
+        print(f"Decode error: invalid plus code {plus_code!r}")
+    return lat, lng
     
 def format_operational_time(time_str: str) -> str:
     """Convert time format to 24-hour format with WIB"""
@@ -166,6 +215,11 @@ def format_operational_time(time_str: str) -> str:
                 t = t.strip().replace('.', ':')
                 try:
                     return datetime.datetime.strptime(t, "%I:%M %p")
+                except ValueError:
+                    pass
+                try:
+                    # network payloads drop the minutes: "9 AM"
+                    return datetime.datetime.strptime(t, "%I %p")
                 except ValueError:
                     return datetime.datetime.strptime(t, "%H:%M")
 
@@ -179,418 +233,695 @@ def format_operational_time(time_str: str) -> str:
         return time_str
     
 def get_kecamatan_id(kecamatan_name: str) -> str:
-    """Maps kecamatan name to its ID (case-insensitive)"""
-    kecamatan_mapping = {
-        "junrejo": "357903",
-        "batu": "357901",
-        "bumiaji": "357902"
-    }
-    return kecamatan_mapping.get(kecamatan_name.lower(), None)
+    """Maps kecamatan name to its ID (case-insensitive, see gazetteer)"""
+    region = default_gazetteer().lookup("kecamatan", kecamatan_name)
+    return region.code if region else None
 
 def extract_desa(address: str) -> str:
     """Extract village name from address using regex pattern"""
     if not address:
         return None
-    # Pattern explanation: Capture text between comma and kecamatan mention
-    # Example: "..., Sisir, Kec. Batu..." -> captures "Sisir"
-    desa_match = re.search(r',\s*([^,]+?)\s*,\s*Kec\.', address, re.IGNORECASE)
+    desa_match = DESA_RE.search(address)
     return desa_match.group(1).strip() if desa_match else None
 
 def get_desa_id(desa_name: str) -> str:
-    """Maps village name to its ID (case-insensitive)"""
-    desa_mapping = {
-        "dadaprejo": "3579031001",
-        "beji": "3579032002",
-        "junrejo": "3579032003",
-        "tlekung": "3579032004",
-        "mojorejo": "3579032005",
-        "pendem": "3579032006",
-        "torongrejo": "3579032007",
-        "temas": "3579011001",
-        "ngaglik": "3579011002",
-        "songgokerto": "3579011003",
-        "sisir": "3579011004",
-        "sumberejo": "3579012005",
-        "oro-oro ombo": "3579012006",
-        "sidomulyo": "3579012007",
-        "pesanggrahan": "3579012008",
-        "punten": "3579022001",
-        "gunungsari": "3579022002",
-        "tulungrejo": "3579022003",
-        "sumbergondo": "3579022004",
-        "pandanrejo": "3579022005",
-        "bumiaji": "3579022006",
-        "giripurno": "3579022007",
-        "bulukerto": "3579022008",
-        "sumberbrantas": "3579022009"
-    }
-    return desa_mapping.get(desa_name.lower().strip(), None)
+    """Maps village name to its ID (case-insensitive, see gazetteer)"""
+    region = default_gazetteer().lookup("desa", desa_name)
+    return region.code if region else None
+
+
+KATEGORI_MAPPING = {
+    "pariwisata": "2",
+    "restoran": "3",
+    "warung": "3",
+    "rumah makan": "3",
+    "food & culinary": "3",
+    "fasilitas kesehatan": "4",
+    "faskes": "4",
+    "tempat ibadah": "5",
+    "dinas & badan opd": "6",
+    "spbu": "7", 
+    "pertanian": "8",
+    "perkebunan": "9",
+    "kebun": "9",
+    "tanah kosong": "11"
+}
 
 
 def get_kategori_id(category_name: str) -> str:
     """Maps category name to its ID (case-insensitive)"""
-    kategori_mapping = {
-        "pariwisata": "2",
-        "restoran": "3",
-        "warung": "3",
-        "rumah makan": "3",
-        "food & culinary": "3",
-        "fasilitas kesehatan": "4",
-        "faskes": "4",
-        "tempat ibadah": "5",
-        "dinas & badan opd": "6",
-        "spbu": "7", 
-        "pertanian": "8",
-        "perkebunan": "9",
-        "kebun": "9",
-        "tanah kosong": "11"
-    }
-    return kategori_mapping.get(category_name.lower().strip(), None)
+    return KATEGORI_MAPPING.get(category_name.lower().strip(), None)
+
+
+def apply_plus_code(business: Business, aria_label: str = None, search_for: str = None):
+    """Fill plus_code, latitude and longitude from the `oloc` button aria-label,
+    falling back to a plus code at the start of the address. The reference
+    point for short codes comes from the region named in the search or label.
+    """
+    reference = region_reference(search_for, aria_label, business.address)
+    if aria_label and "Plus code:" in aria_label:
+        plus_code_full = aria_label.replace("Plus code:", "").strip()
+        business.plus_code = plus_code_full.split(' ')[0]
+        business.latitude, business.longitude = extract_latlng_from_plus_code(business.plus_code, reference)
+    else:
+        business.plus_code = ""
+        business.latitude, business.longitude = None, None
+
+    # Improved address-based extraction
+    if not business.plus_code and business.address:
+        # Split address into parts and check first segment
+        address_first_part = business.address.split(',')[0].strip()
+        plus_code_match = re.search(
+            r'^([A-Z0-9]{4}\+[A-Z0-9]{3,4})',  # Allows 3-4 chars after +
+            address_first_part,
+            re.IGNORECASE
+        )
+        if plus_code_match:
+            business.plus_code = plus_code_match.group(1)
+            business.latitude, business.longitude = extract_latlng_from_plus_code(business.plus_code, reference)
+
+
+def apply_address(business: Business, address_text: str):
+    """Fill address, kecamatan and desa fields from the address text"""
+    if address_text:
+        business.address = address_text
+
+        # kecamatan and desa (names and IDs) in one gazetteer pass
+        resolved = resolve_address(address_text)
+        business.kecamatan = resolved.kecamatan
+        business.kecamatan_id = resolved.kecamatan_id
+        business.desa = resolved.desa
+        business.desa_id = resolved.desa_id
+
+    else:
+        business.address = ""
+        business.kecamatan = None
+        business.kecamatan_id = None
+        business.desa = None
+        business.desa_id = None
+
+
+def search_category(search_for: str) -> str:
+    """Category keyword of a search ("restoran kota Batu" -> restoran)"""
+    category_match = re.search(r'^.*?(\w+)\s+kota\s+batu', search_for, re.IGNORECASE)
+    if category_match:
+        return category_match.group(1).lower().strip()
+    return search_for.split(' in ')[0].strip().lower()
+
+
+def finalize_business(business: Business, search_for: str):
+    """Fill the search-derived and generated fields of a scraped business"""
+    business.built_year = random.choice([2024, 2025, 2026])
+
+    if business.built_year == 2024:
+        business.color = "#309898"
+    elif business.built_year == 2025:
+        business.color = "#F4631E"
+    else:
+        business.color = "#CB0404"
+
+    raw_category = search_category(search_for)
+
+    business.category = raw_category
+
+
+    business.kategori_id = get_kategori_id(raw_category)
+
+    business.assign_random_luas_wilayah()
+    business.assign_random_tahun_berdiri()
+
+
+def copy_embed_html(page) -> str:
+    """Copy the embed <iframe> HTML through Share -> Embed a map -> Copy HTML.
+
+    Only used to verify embed.build_embed_html, the clipboard round trip is
+    the slowest step of a listing.
+    """
+    iframe_url = None
+    # Add iframe URL extraction - with improved selectors
+    try:
+        # Click share button with multiple possible selectors
+        share_selectors = [
+            '//button[@aria-label="Share" and contains(@class, "g88MCb")]',
+            '//button[@aria-label="Share"]',
+            '//button[contains(@class, "g88MCb")]',
+            '//button[contains(@data-value, "Share")]'
+        ]
+        embed_selectors = [
+            '//button[contains(@class, "zaxyGe") and @aria-label="Embed a map"]',
+            '//button[@aria-label="Embed a map"]',
+            '//button[contains(text(), "Embed a map")]',
+            '//button[contains(@class, "waIsr") and @aria-label="Embed a map"]'
+        ]
+        copy_selectors = [
+            '//button[contains(@class, "VVjj3") and contains(@class, "PpaGLb")]',
+            '//button[contains(text(), "Copy HTML")]',
+            '//button[@aria-label="Copy HTML"]',
+            '//button[contains(@class, "VVjj3")]',
+            '//button[contains(@jslog, "50222")]'
+        ]
+
+        share_clicked = False
+        for selector in share_selectors:
+            try:
+                if page.locator(selector).count() > 0:
+                    page.locator(selector).first.click(timeout=5000)
+                    share_clicked = True
+                    break
+            except:
+                continue
+
+        if not share_clicked:
+            raise Exception("Could not find or click Share button")
+
+        readiness.wait_for_share_dialog(page, embed_selectors)
+
+        # Click embed map button with multiple possible selectors
+
+        embed_clicked = False
+        for selector in embed_selectors:
+            try:
+                if page.locator(selector).count() > 0:
+                    page.locator(selector).first.click(timeout=5000)
+                    embed_clicked = True
+                    break
+            except:
+                continue
+
+        if not embed_clicked:
+            raise Exception("Could not find or click Embed a map button")
+
+        readiness.wait_for_embed_dialog(page, copy_selectors)
+
+        # Focus the page first to ensure clipboard access
+        page.focus('body')
+
+        # Clear clipboard first
+        try:
+            page.evaluate("() => navigator.clipboard.writeText('')")
+        except:
+            pass
+
+        # Click the Copy HTML button with multiple possible selectors
+
+        copy_clicked = False
+        for selector in copy_selectors:
+            try:
+                if page.locator(selector).count() > 0:
+                    page.locator(selector).first.click(timeout=5000)
+                    copy_clicked = True
+                    break
+            except:
+                continue
+
+        if not copy_clicked:
+            print("Warning: Could not find Copy HTML button, skipping iframe extraction")
+            iframe_url = None
+        else:
+            # Get clipboard content
+            try:
+                iframe_html = readiness.wait_for_clipboard(page)
+                if iframe_html and isinstance(iframe_html, str) and iframe_html.strip():
+                    iframe_url = iframe_html.strip()
+                else:
+                    iframe_url = None
+            except:
+                iframe_url = None
+
+    except Exception as e:
+        print(f"Error getting iframe URL: {e}")
+        iframe_url = None
+
+    # AGGRESSIVE MODAL CLEANUP - Always execute
+    finally:
+        try:
+            # Escape until the share dialog is detached
+            with profiling.stage("modal_cleanup"):
+                readiness.close_dialogs(page)
+
+        except Exception as cleanup_error:
+            print(f"Modal cleanup error: {cleanup_error}")
+            pass
+
+    return iframe_url
+
+
+def scrape_listing(page, listing, search_for: str, business_list: BusinessList,
+                   verify_embed: bool = False, controller=None, href: str = None) -> Business:
+    """Click a listing (the feed anchor of `href`) and extract its detail panel
+    (images are saved under business_list).
+
+    With a ratecontrol.RateController, the click is paced and the panel
+    response is reported back to it.
+    """
+    if controller is not None:
+        controller.pace()
+    started = time.perf_counter()
+    with profiling.stage("click"):
+        # the URL tells the new panel apart; the title only without a data id
+        previous_name = readiness.current_place_name(page) if not data_id_from_href(href) else None
+        listing.click()
+        ready = readiness.wait_for_place_panel(page, href, previous_name)
+    if controller is not None:
+        controller.observe(controller.classify(
+            (time.perf_counter() - started) * 1000, readiness.current_place_name(page),
+            timed_out=not ready, blocked=not ready and is_blocked_page(page),
+        ))
+    return extract_panel(page, search_for, business_list, verify_embed)
+
+
+def extract_panel(page, search_for: str, business_list: BusinessList, verify_embed: bool = False) -> Business:
+    """Extract the open place detail panel into a Business (one page.evaluate, see panel_extract)"""
+    from panel_extract import panel_to_business, read_panel
+
+    with profiling.stage("extract"):
+        record = read_panel(page)
+        business = panel_to_business(record, search_for)
+
+    if business.name and record.get("photo"):
+        business_list.save_image_url(page, business, record["photo"])
+
+    # Embed HTML is built from the place URL and coordinates, the Share dialog
+    # is only opened to verify it
+    if verify_embed:
+        with profiling.stage("embed"):
+            copied_html = copy_embed_html(page)
+            if copied_html and not embeds_match(business.iframe_url, copied_html):
+                print(f"Embed mismatch for {business.name}, using the copied HTML")
+                business.iframe_url = copied_html
+    return business
+
+
+def output_filename(search_for: str) -> str:
+    return f"{search_for}".replace(' ', '_').replace('\n', '').replace('\r', '')
+
+
+def new_business_list(search_for: str, output_formats: list[str] = None, downloader=None,
+                      dedupe=None, writer=None) -> BusinessList:
+    """BusinessList for a search, streaming to `writer` or to `output_formats` when given"""
+    if writer is not None:
+        return BusinessList(writer=writer, downloader=downloader, dedupe=dedupe, search_for=search_for)
+    if not output_formats:
+        return BusinessList(downloader=downloader, dedupe=dedupe, search_for=search_for)
+    from writers import StreamWriter
+    base_path = os.path.join(BusinessList.save_at, output_filename(search_for))
+    return BusinessList(writer=StreamWriter(base_path, output_formats, downloader=downloader),
+                        downloader=downloader, dedupe=dedupe, search_for=search_for)
+
+
+def save_business_list(business_list: BusinessList, search_for: str):
+    """Write a search's results to excel and csv (or finish its stream writer)"""
+    with profiling.stage("save"):
+        business_list.save(output_filename(search_for))
+
+
+def read_image(business_list: BusinessList, business: Business) -> bytes:
+    """Bytes of the image saved for `business`, None if it has none"""
+    if not business.name_image:
+        return None
+    file_path = os.path.join(business_list.save_at, 'images', business.name_image)
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def journal_places(journal, downloader, search_for: str, places: list, wait: bool = False) -> list:
+    """Journal the (key, business) places whose image has been written (all of
+    them with `wait`) and return the ones still waiting for their image
+    """
+    waiting = []
+    for key, business in places:
+        if downloader is not None:
+            if not wait and not downloader.is_done(business):
+                waiting.append((key, business))
+                continue
+            downloader.wait_for(business)
+        journal.record_place(search_for, key, business)
+    return waiting
+
+
+def scrape_search(page, search_for: str, total: int, log_prefix: str = "", collector=None,
+                  verify_embed: bool = False, cache=None, journal=None,
+                  output_formats: list[str] = None, downloader=None, dedupe=None,
+                  controller=None, preloaded: bool = False, writer=None) -> BusinessList:
+    """Run one search end-to-end on `page` and return its BusinessList.
+
+    With a network_extract.ResponseCollector attached to `page`, listings are
+    built from the Maps XHR payloads and only clicked when fields are missing.
+    With a cache.PlaceCache, places cached by earlier searches or runs are
+    reused without clicking. With a checkpoint.Journal, every place is
+    journaled and places journaled by an interrupted run are skipped.
+    With `output_formats`, records are streamed to disk as they are extracted.
+    With an images.ImageDownloader, images are fetched in the background.
+    With a dedupe.DedupeIndex, places already written by another search of
+    the run are skipped. With a ratecontrol.RateController, clicks are paced
+    adaptively and ThrottledError ends the search. A `preloaded` page was
+    already navigated to the search by a session.PagePool. A `writer` (any
+    object with write(business) and close()) receives records as they are added.
+    """
+    start_search(page, search_for, preloaded)
+
+    business_list = new_business_list(search_for, output_formats, downloader, dedupe, writer)
+    if journal is not None:
+        for key, business in journal.keyed_businesses(search_for):
+            business_list.add_business(business, key)
+    started = time.perf_counter()
+    # cached after the search so image downloads can finish in the background
+    to_cache = []
+
+    # journaled once their image is written, so a resumed run keeps the image fields
+    to_journal = []
+
+    # scraping starts on the first hrefs while the feed keeps loading
+    try:
+        for href in harvest_place_hrefs(page, total, log_prefix=log_prefix):
+            key = place_key(href)
+            if journal is not None and journal.has_place(search_for, key):
+                continue
+            listing = listing_for_href(page, href)
+            try:
+                cached = cache.get(key, search_for) if cache is not None else None
+                if cached is not None:
+                    business, image = cached
+                    if image:
+                        business_list.save_image(business, image)
+                else:
+                    business = None
+                    if collector is not None:
+                        from network_extract import fill_missing, missing_fields
+                        business = collector.business_for(href, search_for, page, business_list)
+                        if business is not None and missing_fields(business):
+                            business = fill_missing(business, scrape_listing(
+                                page, listing, search_for, business_list, verify_embed, controller, href
+                            ))
+                    if business is None:
+                        business = scrape_listing(page, listing, search_for, business_list, verify_embed,
+                                                  controller, href)
+                    if cache is not None:
+                        to_cache.append((key, business))
+
+                business_list.add_business(business, key)
+                if journal is not None:
+                    to_journal = journal_places(journal, downloader, search_for, to_journal + [(key, business)])
+                if len(business_list) == 1:
+                    print(f"{log_prefix}First record after {time.perf_counter() - started:.1f}s")
+                print(f"{log_prefix}Business: {business.name}, Telah disimpan", end='\r')
+            except ThrottledError:
+                raise
+            except Exception as e:
+                # on its own line so the next progress line does not overwrite it
+                print(f'{log_prefix}Error occurred: {e}')
+    finally:
+        if journal is not None:
+            journal_places(journal, downloader, search_for, to_journal, wait=True)
+
+    if to_cache:
+        for key, business in to_cache:
+            if downloader is not None:
+                downloader.wait_for(business)
+            cache.put(key, business, read_image(business_list, business))
+
+    return business_list
+
+
+def load_search_list(args) -> list[str]:
+    """Read searches from the -s argument or from input.txt"""
+    if args.search:
+        return [args.search]
+
+    search_list = []
+    # read search from input.txt file
+    input_file_name = 'input.txt'
+    # Get the absolute path of the file in the current working directory
+    input_file_path = os.path.join(os.getcwd(), input_file_name)
+    # Check if the file exists
+    if os.path.exists(input_file_path):
+    # Open the file in read mode
+        with open(input_file_path, 'r') as file:
+        # Read all lines into a list
+            search_list = file.readlines()
+
+    if len(search_list) == 0:
+        print('Error occured: You must either pass the -s search argument, or add searches to input.txt')
+        sys.exit()
+    return search_list
+
+
+# options of the single-process sync run that the other run modes do not implement
+MODE_OPTIONS = {
+    "resume": "--resume",
+    "cache": "--cache",
+    "refresh": "--refresh",
+    "extract": "--extract network",
+    "verify_embed": "--verify-embed",
+    "output_format": "--output-format",
+    "image_threads": "--image-threads",
+    "adaptive": "--adaptive",
+    "workers": "-w",
+    "session": "--session",
+    "profile_dir": "--profile-dir",
+    "pages": "--pages",
+    "bandwidth": "--bandwidth",
+    "profile": "--profile",
+}
+
+
+def check_mode_options(parser, args):
+    """Reject options the chosen run mode would silently ignore"""
+    if args.queue:
+        mode, supported = "--queue", {"output_format", "workers"}
+    elif args.tile > 0:
+        mode, supported = "--tile", set()
+    elif args.engine == "async":
+        mode, supported = "--engine async", {"adaptive", "session"}
+    elif args.workers > 1:
+        mode, supported = "-w", {"output_format", "image_threads", "workers", "session"}
+    elif args.refresh:
+        # refresh_search keeps its own snapshot instead of the journal and clicks every changed place
+        mode, supported = "--refresh", set(MODE_OPTIONS) - {"resume", "cache", "extract"}
+    else:
+        return
+    ignored = [flag for dest, flag in MODE_OPTIONS.items()
+               if dest not in supported and getattr(args, dest) != parser.get_default(dest)]
+    if ignored:
+        parser.error(f"{', '.join(ignored)} cannot be combined with {mode}")
 
 
-    
 def main():
     # read search from arguments
     parser = argparse.ArgumentParser()
     parser.add_argument("-s", "--search", type=str)
     parser.add_argument("-t", "--total", type=int)
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="number of parallel browser workers")
+    parser.add_argument("--engine", choices=["sync", "async"], default="sync",
+                        help="scraping engine, async keeps several place tabs in flight")
+    parser.add_argument("--tabs", type=int, default=4,
+                        help="max concurrent place tabs for the async engine")
+    parser.add_argument("--extract", choices=["dom", "network"], default="dom",
+                        help="network parses Maps XHR responses and clicks only for missing fields")
+    parser.add_argument("--verify-embed", action="store_true",
+                        help="also copy the embed HTML through the Share dialog and compare")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse places from the on-disk place cache")
+    parser.add_argument("--cache-ttl", type=float, default=7,
+                        help="days before a cached place is scraped again")
+    parser.add_argument("--cache-max-mb", type=float, default=512,
+                        help="size limit of the place cache")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run from the checkpoint journal")
+    parser.add_argument("--lean", action="store_true",
+                        help="headless browser that blocks tiles, fonts, media and analytics")
+    parser.add_argument("--bandwidth", action="store_true",
+                        help="report bytes transferred per search (always on with --lean)")
+    parser.add_argument("--image-threads", type=int, default=4,
+                        help="background image download threads, 0 downloads on the scraping page")
+    parser.add_argument("--output-format", type=str, default="xlsx,csv",
+                        help="comma separated streamed outputs: csv, jsonl, parquet, xlsx")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="pace requests (and async tabs) from observed latency and throttling signals")
+    parser.add_argument("--max-blocks", type=int, default=3,
+                        help="with --adaptive, stop after this many consent/unusual traffic pages")
+    parser.add_argument("--profile", type=str,
+                        help="export stage timings to this file (.prom for Prometheus, else JSON lines)")
+    parser.add_argument("--dedupe-meters", type=float, default=25,
+                        help="same-name places closer than this are merged across the run, 0 keys on place id only")
+    parser.add_argument("--tile", type=float, default=0,
+                        help="tile size in meters: search the region tile by tile (async engine)")
+    parser.add_argument("--bbox", type=str,
+                        help="region to tile as south,west,north,east (default: around the region in the search)")
+    parser.add_argument("--radius", type=float, default=5000,
+                        help="half-size in meters of the default tiling region")
+    parser.add_argument("--tile-concurrency", type=int, default=2,
+                        help="tile feeds scrolled at once")
+    parser.add_argument("--max-depth", type=int, default=2,
+                        help="times a dense tile may be split into quadrants")
+    parser.add_argument("--session", type=str, default=os.path.join('GMaps Data', 'session.json'),
+                        help="cookies/consent saved at the end of a run and reused by the next ('' disables)")
+    parser.add_argument("--profile-dir", type=str,
+                        help="persistent browser profile directory instead of the session file")
+    parser.add_argument("--pages", type=int, default=2,
+                        help="pages kept open across searches, the next search preloads on an idle one")
+    parser.add_argument("--refresh", action="store_true",
+                        help="click only places whose feed card changed since the last refresh, write a diff file")
+    parser.add_argument("--queue", type=str,
+                        help="shared SQLite work queue: enqueue the searches and work it with -w processes")
     args = parser.parse_args()
-    
-    if args.search:
-        search_list = [args.search]
-        
+    check_mode_options(parser, args)
+
     if args.total:
         total = args.total
     else:
         # if no total is passed, we set the value to random big number
         total = 1_000_000
 
-    if not args.search:
-        search_list = []
-        # read search from input.txt file
-        input_file_name = 'input.txt'
-        # Get the absolute path of the file in the current working directory
-        input_file_path = os.path.join(os.getcwd(), input_file_name)
-        # Check if the file exists
-        if os.path.exists(input_file_path):
-        # Open the file in read mode
-            with open(input_file_path, 'r') as file:
-            # Read all lines into a list
-                search_list = file.readlines()
-                
-        if len(search_list) == 0:
-            print('Error occured: You must either pass the -s search argument, or add searches to input.txt')
-            sys.exit()
-    
+    search_list = load_search_list(args)
+    output_formats = [name.strip() for name in args.output_format.split(',') if name.strip()]
+
+    if args.queue:
+        from workqueue import run_queue
+        run_queue(search_list, total, args.queue, args.workers, lean=args.lean, output_formats=output_formats)
+        return
+
+    if args.tile > 0:
+        import asyncio
+        from tiling import parse_bbox, run_tiled
+        asyncio.run(run_tiled(
+            search_list, total, args.tile, parse_bbox(args.bbox) if args.bbox else None, args.radius,
+            args.tabs, args.tile_concurrency, args.max_depth, lean=args.lean, dedupe_meters=args.dedupe_meters,
+        ))
+        return
+
+    if args.engine == "async":
+        import asyncio
+        from async_engine import run_async
+        asyncio.run(run_async(search_list, total, args.tabs, lean=args.lean, dedupe_meters=args.dedupe_meters,
+                              adaptive=args.adaptive, max_blocks=args.max_blocks, session=args.session))
+        return
+
+    if args.workers > 1:
+        from workers import run_worker_pool
+        run_worker_pool(search_list, total, args.workers, lean=args.lean, session=args.session,
+                        output_formats=output_formats, image_threads=args.image_threads,
+                        dedupe_meters=args.dedupe_meters)
+        return
+
+    try:
+        run_journaled(args, search_list, total, output_formats)
+    except Exception as e:
+        print(f'Failed err: {e}')
+        if not args.refresh:
+            print('Progress is kept in the journal, run again with --resume to continue')
+
+
+def run_journaled(args, search_list: list[str], total: int, output_formats: list[str]):
+    """The single-process sync run: journaled (except with --refresh), so an
+    interrupted run continues with --resume
+    """
+    downloader = None
+    if args.image_threads > 0:
+        from images import ImageDownloader
+        downloader = ImageDownloader(os.path.join(BusinessList.save_at, 'images'), threads=args.image_threads)
+
+    # a refresh writes no places to the journal, it must not mark searches done in it
+    journal = None
+    if not args.refresh:
+        from checkpoint import Journal
+        journal = Journal(resume=args.resume)
+
+    from dedupe import DedupeIndex
+    dedupe = DedupeIndex(args.dedupe_meters, os.path.join(BusinessList.save_at, 'dedupe_log.jsonl'))
+
+    # finished searches are rebuilt from the journal without the browser
+    pending = []
+    for search_for_index, search_for in enumerate(search_list):
+        if journal is not None and journal.is_search_done(search_for):
+            print(f"-----\n{search_for_index} - {search_for}".strip() + " (selesai, dari journal)")
+            business_list = new_business_list(search_for, output_formats, downloader, dedupe)
+            for key, business in journal.keyed_businesses(search_for):
+                business_list.add_business(business, key)
+            save_business_list(business_list, search_for)
+        else:
+            pending.append((search_for_index, search_for))
+
+    cache = None
+    if args.cache:
+        from cache import PlaceCache
+        cache = PlaceCache(ttl_days=args.cache_ttl, max_mb=args.cache_max_mb)
+
+    snapshot = None
+    if args.refresh:
+        from refresh import Snapshot, refresh_search
+        snapshot = Snapshot()
+
+    meter = BandwidthMeter() if args.lean or args.bandwidth else None
+    controller = RateController(max_concurrency=1, max_blocks=args.max_blocks) if args.adaptive else None
+
+    from session import PagePool, save_session, session_state
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page(locale="en-GB")
+        browser, context = launch_context(p, lean=args.lean, meter=meter, storage_state=session_state(args.session),
+                                          user_data_dir=args.profile_dir)
 
-        page.goto("https://www.google.com/maps", timeout=20000)
-        
-        for search_for_index, search_for in enumerate(search_list):
+        collector = None
+        if args.extract == "network":
+            from network_extract import ResponseCollector
+            collector = ResponseCollector()
+
+        # searches open by URL on reused pages, the next one loads while this one is scraped
+        pool = PagePool(context, args.pages, on_new_page=collector.attach if collector is not None else None)
+        for position, (search_for_index, search_for) in enumerate(pending):
             print(f"-----\n{search_for_index} - {search_for}".strip())
+            page, preloaded = pool.page_for(search_for)
+            if position + 1 < len(pending):
+                pool.preload(pending[position + 1][1], busy=page)
+            if meter is not None:
+                meter.start(search_for)
+
+            if snapshot is not None:
+                business_list = refresh_search(page, search_for, total, snapshot, verify_embed=args.verify_embed,
+                                               output_formats=output_formats, downloader=downloader,
+                                               dedupe=dedupe, controller=controller, preloaded=preloaded)
+            else:
+                business_list = scrape_search(page, search_for, total, collector=collector,
+                                              verify_embed=args.verify_embed, cache=cache, journal=journal,
+                                              output_formats=output_formats, downloader=downloader, dedupe=dedupe,
+                                              controller=controller, preloaded=preloaded)
 
-            page.locator('//input[@id="searchboxinput"]').fill(search_for)
-            page.wait_for_timeout(3000)
-
-            page.keyboard.press("Enter")
-            page.wait_for_timeout(5000)
-
-            # scrolling
-            page.hover('//a[contains(@href, "https://www.google.com/maps/place")]')
-
-            previously_counted = 0
-            while True:
-                page.mouse.wheel(0, 10000)
-                page.wait_for_timeout(3000)
-
-                if (
-                    page.locator(
-                        '//a[contains(@href, "https://www.google.com/maps/place")]'
-                    ).count()
-                    >= total
-                ):
-                    listings = page.locator(
-                        '//a[contains(@href, "https://www.google.com/maps/place")]'
-                    ).all()[:total]
-                    listings = [listing.locator("xpath=..") for listing in listings]
-                    print(f"Total Scraped: {len(listings)}")
-                    break
-                else:
-                    if (
-                        page.locator(
-                            '//a[contains(@href, "https://www.google.com/maps/place")]'
-                        ).count()
-                        == previously_counted
-                    ):
-                        listings = page.locator(
-                            '//a[contains(@href, "https://www.google.com/maps/place")]'
-                        ).all()
-                        print(f"Arrived at all available\nTotal Scraped: {len(listings)}")
-                        break
-                    else:
-                        previously_counted = page.locator(
-                            '//a[contains(@href, "https://www.google.com/maps/place")]'
-                        ).count()
-                        print(
-                            f"Currently Scraped: ",
-                            page.locator(
-                                '//a[contains(@href, "https://www.google.com/maps/place")]'
-                            ).count(), end='\r'
-                        )
-
-            business_list = BusinessList()
-
-            # scraping
-            for listing in listings:
-                try:                        
-                    listing.click()
-                    page.wait_for_timeout(2000)
-
-                    name_attribute = 'h1.DUwDvf'
-                    address_xpath = '//button[@data-item-id="address"]//div[contains(@class, "fontBodyMedium")]'
-                    plus_code_button_xpath = '//button[contains(@class, "CsEnBe") and @data-item-id="oloc"]'
-                    share_selector = '//button[@aria-label="Share" and contains(@class, "g88MCb")]'
-                    # Updated embed button selector based on new HTML structure
-                    embbed_map_button_selector = '//button[contains(@class, "zaxyGe") and @aria-label="Embed a map"]'
-                    
-                    business = Business()
-                   
-                    if name_value := page.locator(name_attribute).inner_text():
-                        business.name = name_value.strip()
-                    else:
-                        business.name = ""
-
-                    if page.locator(address_xpath).count() > 0:
-                        business.address = page.locator(address_xpath).all()[0].inner_text()
-                    else:
-                        business.address = ""
-                                            # Existing plus code button check
-                    if page.locator(plus_code_button_xpath).count() > 0:
-                        aria_label = page.locator(plus_code_button_xpath).first.get_attribute("aria-label")
-                        if aria_label and "Plus code:" in aria_label:
-                            plus_code_full = aria_label.replace("Plus code:", "").strip()
-                            business.plus_code = plus_code_full.split(' ')[0]
-                            business.latitude, business.longitude = extract_latlng_from_plus_code(business.plus_code)
-                        else:
-                            business.plus_code = ""
-                            business.latitude, business.longitude = None, None
-                    else:
-                        business.plus_code = ""
-                        business.latitude, business.longitude = None, None
-
-                    # Improved address-based extraction
-                    if not business.plus_code and business.address:
-                        # Split address into parts and check first segment
-                        address_first_part = business.address.split(',')[0].strip()
-                        plus_code_match = re.search(
-                            r'^([A-Z0-9]{4}\+[A-Z0-9]{3,4})',  # Allows 3-4 chars after +
-                            address_first_part,
-                            re.IGNORECASE
-                        )
-                        if plus_code_match:
-                            business.plus_code = plus_code_match.group(1)
-                            business.latitude, business.longitude = extract_latlng_from_plus_code(business.plus_code)
-
-                    if name_value := page.locator(name_attribute).inner_text():
-                        business.name = name_value.strip()
-                        business_list.download_image(page, business)  # Fixed: use business_list instead of self
-                    else:
-                        business.name = ""
-
-                    business.category = search_for.split(' in ')[0].strip()
-
-                    try:
-                        monday_row = page.locator('//tr[.//div[text()="Monday"]]')
-                        if monday_row.count() > 0:
-                            time_str = monday_row.locator('td.mxowUb').first.get_attribute('aria-label').strip()
-                            business.jam_operasional = format_operational_time(time_str)
-                        else:
-                            business.jam_operasional = None
-                    except Exception as e:
-                        print(f"Error getting Monday hours: {e}")
-                        business.jam_operasional = None
-
-                    if name_value := page.locator(name_attribute).inner_text():
-                        business.name = name_value.strip()
-                        business_list.download_image(page, business)
-                    else:
-                        business.name = ""
-
-                    # Add iframe URL extraction - with improved selectors
-                    try:
-                        # Click share button with multiple possible selectors
-                        share_selectors = [
-                            '//button[@aria-label="Share" and contains(@class, "g88MCb")]',
-                            '//button[@aria-label="Share"]',
-                            '//button[contains(@class, "g88MCb")]',
-                            '//button[contains(@data-value, "Share")]'
-                        ]
-                        
-                        share_clicked = False
-                        for selector in share_selectors:
-                            try:
-                                if page.locator(selector).count() > 0:
-                                    page.locator(selector).first.click(timeout=5000)
-                                    share_clicked = True
-                                    break
-                            except:
-                                continue
-                        
-                        if not share_clicked:
-                            raise Exception("Could not find or click Share button")
-                            
-                        page.wait_for_timeout(2000)
-                        
-                        # Click embed map button with multiple possible selectors
-                        embed_selectors = [
-                            '//button[contains(@class, "zaxyGe") and @aria-label="Embed a map"]',
-                            '//button[@aria-label="Embed a map"]',
-                            '//button[contains(text(), "Embed a map")]',
-                            '//button[contains(@class, "waIsr") and @aria-label="Embed a map"]'
-                        ]
-                        
-                        embed_clicked = False
-                        for selector in embed_selectors:
-                            try:
-                                if page.locator(selector).count() > 0:
-                                    page.locator(selector).first.click(timeout=5000)
-                                    embed_clicked = True
-                                    break
-                            except:
-                                continue
-                        
-                        if not embed_clicked:
-                            raise Exception("Could not find or click Embed a map button")
-                            
-                        page.wait_for_timeout(2000)
-                        
-                        # Focus the page first to ensure clipboard access
-                        page.focus('body')
-                        page.wait_for_timeout(300)
-                        
-                        # Clear clipboard first
-                        try:
-                            page.evaluate("() => navigator.clipboard.writeText('')")
-                            page.wait_for_timeout(300)
-                        except:
-                            pass
-                        
-                        # Click the Copy HTML button with multiple possible selectors
-                        copy_selectors = [
-                            '//button[contains(@class, "VVjj3") and contains(@class, "PpaGLb")]',
-                            '//button[contains(text(), "Copy HTML")]',
-                            '//button[@aria-label="Copy HTML"]',
-                            '//button[contains(@class, "VVjj3")]',
-                            '//button[contains(@jslog, "50222")]'
-                        ]
-                        
-                        copy_clicked = False
-                        for selector in copy_selectors:
-                            try:
-                                if page.locator(selector).count() > 0:
-                                    page.locator(selector).first.click(timeout=5000)
-                                    copy_clicked = True
-                                    break
-                            except:
-                                continue
-                        
-                        if not copy_clicked:
-                            print("Warning: Could not find Copy HTML button, skipping iframe extraction")
-                            business.iframe_url = None
-                        else:
-                            page.wait_for_timeout(800)
-                            
-                            # Get clipboard content
-                            try:
-                                iframe_html = page.evaluate("() => navigator.clipboard.readText()")
-                                if iframe_html and isinstance(iframe_html, str) and iframe_html.strip():
-                                    business.iframe_url = iframe_html.strip()
-                                else:
-                                    business.iframe_url = None
-                            except:
-                                business.iframe_url = None
-                        
-                    except Exception as e:
-                        print(f"Error getting iframe URL: {e}")
-                        business.iframe_url = None
-                    
-                    # AGGRESSIVE MODAL CLEANUP - Always execute
-                    finally:
-                        try:
-                            # Force close all modals with multiple escape presses
-                            for _ in range(5):
-                                page.keyboard.press("Escape")
-                                page.wait_for_timeout(200)
-                            
-                            # Click outside to ensure modal closes
-                            page.mouse.click(100, 100)
-                            page.wait_for_timeout(500)
-                            
-                        except Exception as cleanup_error:
-                            print(f"Modal cleanup error: {cleanup_error}")
-                            pass
-
-                    business.category = search_for.split(' in ')[0].strip()
-                    business.built_year = random.choice([2024, 2025, 2026])
-                    
-                    if business.built_year == 2024:
-                        business.color = "#309898"
-                    elif business.built_year == 2025:
-                        business.color = "#F4631E"
-                    else:
-                        business.color = "#CB0404"
-
-                    # Single check for address existence
-                    if page.locator(address_xpath).count() > 0:
-                        address_text = page.locator(address_xpath).all()[0].inner_text()
-                        business.address = address_text
-                        
-                        # Single regex match for kecamatan
-                        kec_match = re.search(r'kec\.\s*([^,]+)', address_text, re.IGNORECASE)
-                        if kec_match:
-                            kec_name = kec_match.group(1).strip()
-                            business.kecamatan = kec_name
-                            business.kecamatan_id = get_kecamatan_id(kec_name)
-                        else:
-                            business.kecamatan = None
-                            business.kecamatan_id = None
-                            
-                        # Desa extraction
-                        business.desa = extract_desa(address_text)
-                        business.desa_id = get_desa_id(business.desa) if business.desa else None
-                        
-                    else:
-                        business.address = ""
-                        business.kecamatan = None
-                        business.kecamatan_id = None
-                        business.desa = None
-                        business.desa_id = None
-
-                    category_match = re.search(r'^.*?(\w+)\s+kota\s+batu', search_for, re.IGNORECASE)
-                    if category_match:
-                        raw_category = category_match.group(1).lower().strip()
-                    else:
-                        raw_category = search_for.split(' in ')[0].strip().lower()
-                    
-                    business.category = raw_category
-
-
-                    business.kategori_id = get_kategori_id(raw_category)
-
-                    business.assign_random_luas_wilayah()
-                    business.assign_random_tahun_berdiri()
-                    business_list.add_business(business)
-                    print(f"Business: {business.name}, Telah disimpan", end='\r')
-                except Exception as e:
-                    print(f'Error occurred: {e}', end='\r')
-            
             # output
-            filename = f"{search_for}".replace(' ', '_').replace('\n', '').replace('\r', '')
-            business_list.save_to_excel(filename)
-            business_list.save_to_csv(filename)
+            save_business_list(business_list, search_for)
+            if journal is not None:
+                journal.record_search_done(search_for)
+            if meter is not None:
+                meter.stop()
+        if not args.profile_dir:
+            save_session(context, args.session)
         browser.close()
+    if journal is not None:
+        journal.close()
+    dedupe.close()
+    dedupe.print_summary()
+    if downloader is not None:
+        downloader.close()
+        downloader.print_summary()
+    readiness.print_summary()
+    profiling.print_summary()
+    pool.print_summary()
+    if controller is not None:
+        controller.print_summary()
+    if args.profile:
+        profiling.profiler.export(args.profile)
+    if meter is not None:
+        meter.print_summary()
+    if collector is not None:
+        print(f"Network extraction: {len(collector.records)} places from {collector.responses} responses, "
+              f"parsed in {collector.parse_seconds * 1000:.1f} ms")
+    if cache is not None:
+        cache.print_summary()
+        cache.close()
+    if snapshot is not None:
+        snapshot.close()
+
 
 if __name__ == "__main__":
     try:
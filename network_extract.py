@@ -0,0 +1,210 @@
+"""Network-response extraction mode.
+
+Google Maps already receives every place in the results feed through its
+search/place XHR responses. ResponseCollector hooks page.on("response"),
+parses those payloads with the pure parse_response() and keeps the records by
+place data id, so scrape_search can build a Business without clicking the
+listing and only fall back to the click path when required fields are missing.
+
+parse_response() has no browser dependency. Saved response bodies can be
+parsed and timed offline:
+
+    python network_extract.py saved_response_1.txt saved_response_2.txt
+"""
+import json
+import re
+import sys
+import time
+
+from openlocationcode import openlocationcode as olc
+
+from embed import build_embed_html, data_id_from_href
+from main import Business, apply_address, apply_plus_code, finalize_business, format_operational_time
+
+XSSI_PREFIX = ")]}'"
+RESPONSE_URL_PATTERNS = ("/search?tbm=map", "/maps/preview/place", "/maps/preview/entity")
+
+# position of every field inside a place array of the Maps payload
+PLACE_FIELDS = {
+    "data_id": (10,),
+    "name": (11,),
+    "category": (13, 0),
+    "address": (39,),
+    "latitude": (9, 2),
+    "longitude": (9, 3),
+    "hours": (34, 1),
+    "place_id": (78,),
+    "photo": (72, 0, 1, 6, 0),
+    "plus_code": (183, 2, 2, 0),
+}
+
+# a Business built from the network without these is completed by clicking
+REQUIRED_FIELDS = ("name", "address", "latitude", "longitude")
+
+DATA_ID_RE = re.compile(r'^0x[0-9a-f]+:0x[0-9a-f]+$')
+
+
+def _dig(data, path):
+    """Follow `path` into nested lists, None if any step is missing"""
+    for index in path:
+        if not isinstance(data, list) or index >= len(data):
+            return None
+        data = data[index]
+    return data
+
+
+def load_payload(text: str):
+    """Decode a Maps XHR body: strip the XSSI guard and unwrap {"d": "..."} envelopes"""
+    if not text:
+        return None
+    text = text.strip()
+    if text.endswith('/*""*/'):
+        text = text[:-len('/*""*/')]
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(payload, dict) and isinstance(payload.get("d"), str):
+        return load_payload(payload["d"])
+    return payload
+
+
+def _is_place(node) -> bool:
+    return (
+        isinstance(_dig(node, PLACE_FIELDS["name"]), str)
+        and isinstance(_dig(node, PLACE_FIELDS["data_id"]), str)
+        and DATA_ID_RE.match(_dig(node, PLACE_FIELDS["data_id"])) is not None
+    )
+
+
+def find_place_arrays(payload):
+    """Yield every nested array that looks like a place record"""
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, list):
+            continue
+        if _is_place(node):
+            yield node
+            continue
+        stack.extend(reversed(node))
+
+
+def _monday_hours(hours):
+    """Monday's opening hours string from the payload's weekly hours list"""
+    for day in hours or []:
+        if _dig(day, (0,)) == "Monday":
+            value = _dig(day, (1, 0))
+            return value if isinstance(value, str) else None
+    return None
+
+
+def parse_place(place: list) -> dict:
+    """Turn one place array into a flat record dict"""
+    record = {name: _dig(place, path) for name, path in PLACE_FIELDS.items()}
+    record["monday_hours"] = _monday_hours(record.pop("hours"))
+    for coordinate in ("latitude", "longitude"):
+        if not isinstance(record[coordinate], (int, float)):
+            record[coordinate] = None
+    if not isinstance(record["plus_code"], str):
+        record["plus_code"] = None
+    return record
+
+
+def parse_response(text: str) -> list[dict]:
+    """Parse a Maps search/place response body into place records (pure)"""
+    payload = load_payload(text)
+    if payload is None:
+        return []
+    return [parse_place(place) for place in find_place_arrays(payload)]
+
+
+def record_to_business(record: dict, search_for: str) -> Business:
+    """Build a Business from a parsed record, leaving unknown fields empty"""
+    business = Business()
+    business.name = (record.get("name") or "").strip()
+    business.address = record.get("address") or ""
+
+    if record.get("plus_code"):
+        apply_plus_code(business, f"Plus code: {record['plus_code']}", search_for)
+    elif record.get("latitude") is not None and record.get("longitude") is not None:
+        # Maps shows the plus code without the 4 leading region digits
+        business.plus_code = olc.encode(record["latitude"], record["longitude"])[4:]
+    if record.get("latitude") is not None and record.get("longitude") is not None:
+        business.latitude, business.longitude = record["latitude"], record["longitude"]
+
+    if record.get("monday_hours"):
+        business.jam_operasional = format_operational_time(record["monday_hours"])
+
+    business.iframe_url = build_embed_html(
+        business.latitude, business.longitude, business.name, record.get("data_id")
+    )
+
+    apply_address(business, business.address)
+    finalize_business(business, search_for)
+    return business
+
+
+def missing_fields(business: Business) -> list[str]:
+    """Required fields the network record could not provide"""
+    return [name for name in REQUIRED_FIELDS if getattr(business, name) in (None, "")]
+
+
+def fill_missing(business: Business, clicked: Business) -> Business:
+    """Complete a network-built business with fields from the click path"""
+    for name, value in vars(clicked).items():
+        if getattr(business, name) in (None, "") and value not in (None, ""):
+            setattr(business, name, value)
+    return business
+
+
+class ResponseCollector:
+    """Collects place records from a page's Maps XHR responses"""
+
+    def __init__(self):
+        self.records = {}
+        self.responses = 0
+        self.parse_seconds = 0.0
+
+    def attach(self, page):
+        page.on("response", self.on_response)
+
+    def on_response(self, response):
+        if not any(pattern in response.url for pattern in RESPONSE_URL_PATTERNS):
+            return
+        try:
+            text = response.text()
+        except Exception:
+            return
+        started = time.perf_counter()
+        for record in parse_response(text):
+            # later responses (place detail) are richer than the feed, merge them in
+            known = self.records.setdefault(record["data_id"], {})
+            known.update({key: value for key, value in record.items() if value is not None})
+        self.parse_seconds += time.perf_counter() - started
+        self.responses += 1
+
+    def business_for(self, href: str, search_for: str, page=None, business_list=None) -> Business:
+        """Business for the listing at `href`, or None if no response covered it"""
+        record = self.records.get(data_id_from_href(href))
+        if record is None:
+            return None
+        business = record_to_business(record, search_for)
+        if page is not None and business_list is not None and record.get("photo"):
+            # through the list's ImageDownloader when it has one
+            business_list.save_image_url(page, business, record["photo"])
+        return business
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as file:
+            body = file.read()
+        started = time.perf_counter()
+        records = parse_response(body)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{path}: {len(records)} places in {elapsed_ms:.2f} ms")
+        for record in records:
+            print(f"  {record['data_id']}  {record['name']}  ({record['latitude']}, {record['longitude']})")
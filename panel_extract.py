@@ -0,0 +1,77 @@
+"""Place detail panel extraction in one round trip.
+
+Every field of the open place panel (name, address, plus code label, the
+weekly hours table, photo src and the place URL) is read by a single
+page.evaluate call driven by the selector tables below, instead of one
+Playwright round trip per locator count / text / attribute. The returned
+record is a plain dict, turned into a Business by the pure panel_to_business(),
+so the sync and async engines share both the selectors and the post-processing.
+"""
+from embed import build_embed_html, data_id_from_href
+from main import Business, apply_address, apply_plus_code, finalize_business, format_operational_time
+from readiness import PLACE_NAME_SELECTOR
+
+# record field -> (CSS selector or XPath, attribute to read; None reads innerText)
+PANEL_FIELDS = {
+    "name": (PLACE_NAME_SELECTOR, None),
+    "address": ('//button[@data-item-id="address"]//div[contains(@class, "fontBodyMedium")]', None),
+    "plus_code_label": ('//button[contains(@class, "CsEnBe") and @data-item-id="oloc"]', "aria-label"),
+    "photo": ('//button[contains(@aria-label, "Photo of")]/img', "src"),
+}
+# rows of the opening hours table: day name cell and the cell whose aria-label holds the hours
+HOURS_SELECTORS = {
+    "row": '//tr[td[contains(@class, "mxowUb")]]',
+    "day": 'td:first-child div',
+    "value": 'td.mxowUb',
+}
+
+PANEL_JS = """
+([fields, hours]) => {
+    const first = (selector) => selector.startsWith('/')
+        ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(selector);
+    const record = {url: location.href, hours: {}};
+    for (const [name, [selector, attribute]] of Object.entries(fields)) {
+        const node = first(selector);
+        record[name] = node ? (attribute ? node.getAttribute(attribute) : node.innerText) : null;
+    }
+    const rows = document.evaluate(hours.row, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < rows.snapshotLength; i++) {
+        const day = rows.snapshotItem(i).querySelector(hours.day);
+        const value = rows.snapshotItem(i).querySelector(hours.value);
+        if (day && value) record.hours[day.innerText.trim()] = value.getAttribute('aria-label');
+    }
+    return record;
+}
+"""
+
+
+def read_panel(page) -> dict:
+    """Every field of the open place panel in one call:
+    {url, name, address, plus_code_label, photo, hours: {day: hours}}
+    """
+    return page.evaluate(PANEL_JS, [PANEL_FIELDS, HOURS_SELECTORS])
+
+
+async def read_panel_async(page) -> dict:
+    return await page.evaluate(PANEL_JS, [PANEL_FIELDS, HOURS_SELECTORS])
+
+
+def panel_to_business(record: dict, search_for: str) -> Business:
+    """Build a Business from a panel record (pure, no browser access)"""
+    business = Business()
+    business.name = (record.get("name") or "").strip()
+    business.address = record.get("address") or ""
+    apply_plus_code(business, record.get("plus_code_label"), search_for)
+
+    monday_hours = (record.get("hours") or {}).get("Monday")
+    if monday_hours:
+        business.jam_operasional = format_operational_time(monday_hours.strip())
+
+    business.iframe_url = build_embed_html(
+        business.latitude, business.longitude, business.name, data_id_from_href(record.get("url"))
+    )
+
+    apply_address(business, business.address)
+    finalize_business(business, search_for)
+    return business
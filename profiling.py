@@ -0,0 +1,147 @@
+"""Per-stage timing of a scraping run.
+
+Every stage of a listing (search, scroll, click, extract, image, embed, modal
+cleanup, save) is wrapped in `stage(name)`, which records its latency into a
+fixed-bucket histogram together with call and error counts. Recording is a
+dict update under a lock, cheap enough to leave on for every run; the image
+stage is recorded from the downloader threads.
+
+At the end of a run print_summary() prints one table row per stage and
+export() writes the same data as JSON lines or as a Prometheus text file
+(.prom, for the node_exporter textfile collector).
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# histogram upper bounds in ms, the last bucket is +Inf
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+STAGES = ("search", "scroll", "click", "extract", "image", "embed", "modal_cleanup", "save")
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    buckets: list = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+    last_error: str = None
+
+    def record(self, elapsed_ms: float, error: str = None):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        index = next((i for i, bound in enumerate(BUCKETS_MS) if elapsed_ms <= bound), len(BUCKETS_MS))
+        self.buckets[index] += 1
+        if error is not None:
+            self.errors += 1
+            self.last_error = error
+
+    def quantile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-quantile, at most the max"""
+        rank, seen = q * self.count, 0
+        for index, in_bucket in enumerate(self.buckets):
+            seen += in_bucket
+            if seen >= rank and in_bucket:
+                return min(BUCKETS_MS[index], self.max_ms) if index < len(BUCKETS_MS) else self.max_ms
+        return 0.0
+
+
+class Profiler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.started = time.time()
+
+    def record(self, stage: str, elapsed_ms: float, error: str = None):
+        with self.lock:
+            self.stages.setdefault(stage, StageStats()).record(elapsed_ms, error)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the block under `name`; an exception is counted and re-raised"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(name, (time.perf_counter() - started) * 1000, f"{type(e).__name__}: {e}")
+            raise
+        self.record(name, (time.perf_counter() - started) * 1000)
+
+    def _ordered(self):
+        order = {name: index for index, name in enumerate(STAGES)}
+        with self.lock:
+            return sorted(self.stages.items(), key=lambda item: order.get(item[0], len(order)))
+
+    def summary(self) -> str:
+        lines = [
+            f"{'stage':<15}{'count':>7}{'errors':>8}{'err %':>7}{'mean ms':>10}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'total s':>9}"
+        ]
+        for name, entry in self._ordered():
+            mean = entry.total_ms / entry.count if entry.count else 0
+            error_rate = 100 * entry.errors / entry.count if entry.count else 0
+            lines.append(
+                f"{name:<15}{entry.count:>7}{entry.errors:>8}{error_rate:>7.1f}{mean:>10.0f}"
+                f"{entry.quantile(0.5):>9.0f}{entry.quantile(0.95):>9.0f}{entry.max_ms:>9.0f}"
+                f"{entry.total_ms / 1000:>9.1f}"
+            )
+        for name, entry in self._ordered():
+            if entry.last_error:
+                lines.append(f"last {name} error: {entry.last_error}")
+        return "\n".join(lines)
+
+    def export_jsonl(self, path: str):
+        """Append one JSON line per stage"""
+        with open(path, 'a', encoding='utf-8') as f:
+            for name, entry in self._ordered():
+                f.write(json.dumps({
+                    "run_started": self.started, "stage": name, "count": entry.count,
+                    "errors": entry.errors, "total_ms": round(entry.total_ms, 1), "max_ms": round(entry.max_ms, 1),
+                    "buckets_ms": dict(zip([*map(str, BUCKETS_MS), "inf"], entry.buckets)),
+                    "last_error": entry.last_error,
+                }, ensure_ascii=False) + "\n")
+
+    def export_prometheus(self, path: str):
+        """Write the stages as Prometheus histograms and error counters"""
+        lines = [
+            "# HELP gmaps_stage_duration_seconds Time spent per scraping stage.",
+            "# TYPE gmaps_stage_duration_seconds histogram",
+        ]
+        for name, entry in self._ordered():
+            cumulative = 0
+            for bound, in_bucket in zip([*BUCKETS_MS, None], entry.buckets):
+                cumulative += in_bucket
+                le = "+Inf" if bound is None else f"{bound / 1000:g}"
+                lines.append(f'gmaps_stage_duration_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'gmaps_stage_duration_seconds_sum{{stage="{name}"}} {entry.total_ms / 1000:.3f}')
+            lines.append(f'gmaps_stage_duration_seconds_count{{stage="{name}"}} {entry.count}')
+        lines += [
+            "# HELP gmaps_stage_errors_total Failed calls per scraping stage.",
+            "# TYPE gmaps_stage_errors_total counter",
+        ]
+        for name, entry in self._ordered():
+            lines.append(f'gmaps_stage_errors_total{{stage="{name}"}} {entry.errors}')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    def export(self, path: str):
+        """Prometheus text for *.prom, JSON lines otherwise"""
+        if path.endswith(".prom"):
+            self.export_prometheus(path)
+        else:
+            self.export_jsonl(path)
+
+
+profiler = Profiler()
+stage = profiler.stage
+record = profiler.record
+
+
+def print_summary():
+    if profiler.stages:
+        print("-----\nStage timings:")
+        print(profiler.summary())
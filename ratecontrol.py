@@ -0,0 +1,148 @@
+"""Adaptive pacing for place requests (AIMD).
+
+RateController keeps a delay before every place request and, for the async
+engine, a window of places in flight. Both follow the response of Maps:
+
+- a fast, complete place panel grows the window additively (+1 per window of
+  successes) and shortens the delay by `delay_step_ms`
+- a slow response (over `target_latency_ms`), an empty panel or a selector
+  timeout halves the window and doubles the delay
+- a consent or "unusual traffic" page drops to one place in flight, waits
+  `cooldown_s` and raises ThrottledError after `max_blocks` of them, so a
+  blocked run stops early instead of scraping empty pages
+
+Limits (min/max delay and concurrency) are fixed per run.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+BLOCK_URL_PARTS = ("/sorry/", "consent.google.com")
+BLOCK_TEXT_JS = """
+() => {
+    const text = (document.body && document.body.innerText || '').slice(0, 5000).toLowerCase();
+    return text.includes('unusual traffic') || text.includes('before you continue');
+}
+"""
+
+OK = "ok"
+SLOW = "slow"
+EMPTY_PANEL = "empty_panel"
+TIMEOUT = "timeout"
+BLOCKED = "blocked"
+
+
+class ThrottledError(Exception):
+    """Maps kept answering with consent / unusual traffic pages"""
+
+
+def is_blocked_page(page) -> bool:
+    """Whether `page` shows a consent or "unusual traffic" interstitial"""
+    if any(part in page.url for part in BLOCK_URL_PARTS):
+        return True
+    try:
+        return bool(page.evaluate(BLOCK_TEXT_JS))
+    except Exception:
+        return False
+
+
+async def is_blocked_page_async(page) -> bool:
+    if any(part in page.url for part in BLOCK_URL_PARTS):
+        return True
+    try:
+        return bool(await page.evaluate(BLOCK_TEXT_JS))
+    except Exception:
+        return False
+
+
+@dataclass
+class RateController:
+    min_delay_ms: float = 0
+    max_delay_ms: float = 20000
+    delay_step_ms: float = 100
+    min_concurrency: int = 1
+    max_concurrency: int = 4
+    target_latency_ms: float = 4000
+    backoff: float = 0.5
+    cooldown_s: float = 60
+    max_blocks: int = 3
+    delay_ms: float = 0
+    window: float = 1
+    in_flight: int = 0
+    signals: dict = field(default_factory=dict)
+    _last_request: float = 0.0
+    _cooldown: bool = False
+    _condition: asyncio.Condition = None
+    _pacing: asyncio.Lock = None
+
+    def __post_init__(self):
+        self.delay_ms = max(self.delay_ms, self.min_delay_ms)
+        self.window = min(max(self.window, self.min_concurrency), self.max_concurrency)
+
+    @property
+    def concurrency(self) -> int:
+        return int(self.window)
+
+    def classify(self, latency_ms: float, name: str = None, timed_out: bool = False, blocked: bool = False) -> str:
+        if blocked:
+            return BLOCKED
+        if timed_out:
+            return TIMEOUT
+        if not name:
+            return EMPTY_PANEL
+        if latency_ms > self.target_latency_ms:
+            return SLOW
+        return OK
+
+    def observe(self, signal: str):
+        """Adjust delay and window after one place request"""
+        self.signals[signal] = self.signals.get(signal, 0) + 1
+        if signal == OK:
+            self.window = min(self.max_concurrency, self.window + 1 / max(self.window, 1))
+            self.delay_ms = max(self.min_delay_ms, self.delay_ms - self.delay_step_ms)
+        elif signal == BLOCKED:
+            self.window = self.min_concurrency
+            self.delay_ms = self.max_delay_ms
+            self._cooldown = True
+            if self.signals[BLOCKED] >= self.max_blocks:
+                raise ThrottledError(f"blocked {self.signals[BLOCKED]} times, stopping the run")
+        else:
+            self.window = max(self.min_concurrency, self.window * self.backoff)
+            self.delay_ms = min(self.max_delay_ms, max(self.delay_ms * 2, self.delay_step_ms))
+
+    def _wait_ms(self) -> float:
+        return max(0.0, self.delay_ms - (time.perf_counter() - self._last_request) * 1000)
+
+    def pace(self):
+        """Sleep until the next request is due (sync engine)"""
+        if self._cooldown:
+            self._cooldown = False
+            time.sleep(self.cooldown_s)
+        time.sleep(self._wait_ms() / 1000)
+        self._last_request = time.perf_counter()
+
+    async def __aenter__(self):
+        """Wait for a free slot in the window, then for the delay (async engine)"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+            self._pacing = asyncio.Lock()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+        # request starts are spaced by the delay, one at a time
+        async with self._pacing:
+            if self._cooldown:
+                self._cooldown = False
+                await asyncio.sleep(self.cooldown_s)
+            await asyncio.sleep(self._wait_ms() / 1000)
+            self._last_request = time.perf_counter()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def print_summary(self):
+        counts = ", ".join(f"{count} {signal}" for signal, count in self.signals.items())
+        print(f"Rate control: delay {self.delay_ms:.0f} ms, {self.concurrency} in flight; signals: {counts or 'none'}")
@@ -0,0 +1,193 @@
+"""Event-driven readiness waits that replace the fixed wait_for_timeout sleeps.
+
+Every wait targets a concrete condition (the place title changing, a dialog
+button appearing, the modal detaching, the feed growing) with its own timeout,
+and records how long it actually took next to the fixed delay it replaces, so
+the time saved can be reported at the end of a run.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+
+from embed import data_id_from_href
+
+PLACE_NAME_SELECTOR = 'h1.DUwDvf'
+PLACE_LINK_XPATH = '//a[contains(@href, "https://www.google.com/maps/place")]'
+DIALOG_SELECTOR = 'div[role="dialog"]'
+
+# the fixed sleeps (ms) each step used before, kept for the time-saved report
+LEGACY_DELAYS = {
+    "search_results": 3000 + 5000,
+    "scroll": 3000,
+    "place_panel": 2000,
+    "share_dialog": 2000,
+    "embed_dialog": 2000 + 300 + 300,
+    "clipboard": 800,
+    "modal_close": 5 * 200 + 500,
+}
+
+
+@dataclass
+class StepTimeouts:
+    """Upper bound (ms) for every readiness wait"""
+    search_results: int = 15000
+    scroll: int = 3000
+    place_panel: int = 10000
+    share_dialog: int = 5000
+    embed_dialog: int = 5000
+    clipboard: int = 3000
+    modal_close: int = 2000
+
+
+@dataclass
+class WaitStats:
+    """Per-step count, time actually waited and fixed delay replaced"""
+    steps: dict = field(default_factory=dict)
+    # service.py records from several browser threads
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, step: str, waited_ms: float, timed_out: bool = False):
+        with self.lock:
+            entry = self.steps.setdefault(step, {"count": 0, "waited_ms": 0.0, "legacy_ms": 0, "timeouts": 0})
+            entry["count"] += 1
+            entry["waited_ms"] += waited_ms
+            entry["legacy_ms"] += LEGACY_DELAYS.get(step, 0)
+            entry["timeouts"] += int(timed_out)
+
+    def summary(self) -> str:
+        """Table of waited vs fixed-delay time per step"""
+        lines = [f"{'step':<16}{'count':>7}{'waited s':>11}{'fixed s':>10}{'saved s':>10}{'timeouts':>10}"]
+        total_waited = total_legacy = 0.0
+        with self.lock:
+            steps = [(step, dict(entry)) for step, entry in self.steps.items()]
+        for step, entry in steps:
+            waited = entry["waited_ms"] / 1000
+            legacy = entry["legacy_ms"] / 1000
+            total_waited += waited
+            total_legacy += legacy
+            lines.append(
+                f"{step:<16}{entry['count']:>7}{waited:>11.1f}{legacy:>10.1f}"
+                f"{legacy - waited:>10.1f}{entry['timeouts']:>10}"
+            )
+        lines.append(
+            f"{'total':<16}{'':>7}{total_waited:>11.1f}{total_legacy:>10.1f}{total_legacy - total_waited:>10.1f}"
+        )
+        return "\n".join(lines)
+
+
+timeouts = StepTimeouts()
+stats = WaitStats()
+
+
+def _timed(step: str, wait):
+    """Run `wait()` and record it under `step`; a timeout is recorded, not raised"""
+    started = time.perf_counter()
+    timed_out = False
+    try:
+        result = wait()
+    except Exception:
+        result = None
+        timed_out = True
+    stats.record(step, (time.perf_counter() - started) * 1000, timed_out)
+    return result
+
+
+def any_of(selectors: list[str]) -> str:
+    """Join xpath selectors into one union selector"""
+    return " | ".join(selectors)
+
+
+def current_place_name(page) -> str:
+    """Text of the open place title, or None when no place panel is open"""
+    return page.evaluate(
+        "sel => { const el = document.querySelector(sel); return el ? el.innerText : null; }",
+        PLACE_NAME_SELECTOR,
+    )
+
+
+def wait_for_search_results(page):
+    """Wait until the results feed (or a single place panel) is rendered"""
+    _timed("search_results", lambda: page.locator(
+        any_of([PLACE_LINK_XPATH, '//h1[contains(@class, "DUwDvf")]'])
+    ).first.wait_for(state="visible", timeout=timeouts.search_results))
+
+
+def wait_for_feed_growth(page, previous_count: int):
+    """Wait until the results feed holds more links than `previous_count`"""
+    _timed("scroll", lambda: page.wait_for_function(
+        "([xpath, count]) => document.evaluate(xpath, document, null,"
+        " XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength > count",
+        arg=[PLACE_LINK_XPATH, previous_count],
+        timeout=timeouts.scroll,
+    ))
+
+
+def wait_for_place_panel(page, href: str = None, previous_name: str = None) -> bool:
+    """Wait until the place title is shown and the page URL carries the data id
+    of `href` (the place clicked or opened); False if it timed out.
+
+    Places with the same name in a row (branches of a chain) are told apart by
+    the URL. Without a data id in `href`, the title has to differ from
+    `previous_name` instead.
+    """
+    return _timed("place_panel", lambda: page.wait_for_function(
+        "([sel, dataId, previous]) => { const el = document.querySelector(sel);"
+        " if (!el || el.innerText.trim() === '') return false;"
+        " if (dataId) return decodeURIComponent(location.href).includes(dataId);"
+        " return el.innerText !== previous; }",
+        arg=[PLACE_NAME_SELECTOR, data_id_from_href(href), previous_name],
+        timeout=timeouts.place_panel,
+    )) is not None
+
+
+def wait_for_share_dialog(page, embed_selectors: list[str]):
+    """Wait until the Share dialog offers the Embed a map tab"""
+    _timed("share_dialog", lambda: page.locator(any_of(embed_selectors)).first.wait_for(
+        state="visible", timeout=timeouts.share_dialog
+    ))
+
+
+def wait_for_embed_dialog(page, copy_selectors: list[str]):
+    """Wait until the Embed tab shows its Copy HTML button"""
+    _timed("embed_dialog", lambda: page.locator(any_of(copy_selectors)).first.wait_for(
+        state="visible", timeout=timeouts.embed_dialog
+    ))
+
+
+def wait_for_clipboard(page) -> str:
+    """Poll the clipboard until Copy HTML has written to it"""
+    def poll():
+        deadline = time.perf_counter() + timeouts.clipboard / 1000
+        while time.perf_counter() < deadline:
+            text = page.evaluate("() => navigator.clipboard.readText()")
+            if text and text.strip():
+                return text
+            page.wait_for_timeout(50)
+        raise TimeoutError("clipboard stayed empty")
+    return _timed("clipboard", poll)
+
+
+def close_dialogs(page, max_presses: int = 5):
+    """Press Escape until no dialog is attached, clicking outside as a last resort"""
+    def close():
+        dialog = page.locator(DIALOG_SELECTOR)
+        for _ in range(max_presses):
+            if dialog.count() == 0:
+                return
+            page.keyboard.press("Escape")
+            try:
+                dialog.first.wait_for(state="detached", timeout=timeouts.modal_close / max_presses)
+                return
+            except Exception:
+                continue
+        # Click outside to ensure modal closes
+        page.mouse.click(100, 100)
+        dialog.first.wait_for(state="detached", timeout=timeouts.modal_close)
+    _timed("modal_close", close)
+
+
+def print_summary():
+    """Print the time-saved table if any readiness wait ran"""
+    if stats.steps:
+        print("-----\nReadiness waits vs fixed delays:")
+        print(stats.summary())
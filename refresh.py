@@ -0,0 +1,189 @@
+"""Incremental refresh: re-scrape only the places whose feed card changed.
+
+A refresh run scrolls the results feed of every search as usual, but
+fingerprints each result card (name, rating and review count, category,
+address snippet, hours line) instead of clicking it. Places whose
+fingerprint matches the snapshot of the previous refresh are copied from the
+snapshot (with their image); only new and changed places are clicked. The
+output is the usual merged file per search plus `<search>_diff.jsonl` with
+one line per added, changed or removed place.
+
+The snapshot (GMaps Data/refresh.sqlite) holds the fingerprint, record and
+image of every place per search and is replaced by each refresh; the first
+refresh of a search scrapes everything and seeds it. Places are only
+reported as removed when the whole feed was read, up to Maps' end-of-list
+marker (not cut off by -t or by scrolls that load nothing). A changed card
+whose scraped fields all match the snapshot only updates its fingerprint.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from dataclasses import asdict
+
+from harvester import harvest_place_hrefs, listing_for_href, place_key, start_search
+from main import (
+    Business,
+    BusinessList,
+    new_business_list,
+    output_filename,
+    read_image,
+    scrape_listing,
+)
+from ratecontrol import ThrottledError
+
+DEFAULT_SNAPSHOT_PATH = os.path.join('GMaps Data', 'refresh.sqlite')
+
+# card lines that depend on the time of day ("Open ⋅ Closes 9 PM"), not on the place
+STATUS_RE = re.compile(r'^(open|closed|opens|closes)\b', re.IGNORECASE)
+CARD_SEPARATORS_RE = re.compile(r'[\n·⋅]')
+# scraped fields compared for the diff; generated ones (built_year, color, the
+# timestamped iframe_url, ...) differ on every scrape
+DIFF_FIELDS = ("name", "address", "plus_code", "latitude", "longitude", "jam_operasional", "kecamatan", "desa")
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+
+def fingerprint(card_text: str) -> str:
+    """Hash of a result card's text without its open/closed status"""
+    parts = (part.strip().lower() for part in CARD_SEPARATORS_RE.split(card_text or ""))
+    kept = [part for part in parts if part and not STATUS_RE.match(part)]
+    return hashlib.sha1("\n".join(kept).encode("utf-8")).hexdigest()
+
+
+def changed_fields(before: Business, after: Business) -> list[str]:
+    return [name for name in DIFF_FIELDS if getattr(before, name) != getattr(after, name)]
+
+
+class Snapshot:
+    """SQLite store of the last refresh: fingerprint, record and image per place and search"""
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS places (
+                search TEXT NOT NULL,
+                key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                record TEXT NOT NULL,
+                image BLOB,
+                updated REAL NOT NULL,
+                PRIMARY KEY (search, key)
+            )"""
+        )
+        self.conn.commit()
+
+    def load(self, search_for: str) -> dict:
+        """{key: (fingerprint, Business, image bytes)} of a search's last refresh"""
+        return {
+            key: (fp, Business(**json.loads(record)), image)
+            for key, fp, record, image in self.conn.execute(
+                "SELECT key, fingerprint, record, image FROM places WHERE search = ?", (search_for.strip(),)
+            )
+        }
+
+    def replace(self, search_for: str, entries: list, removed: list = None):
+        """Store (key, fingerprint, Business, image) entries of a search, dropping `removed` keys"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO places (search, key, fingerprint, record, image, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(search_for.strip(), key, fp, json.dumps(asdict(business)), image, now)
+                 for key, fp, business, image in entries],
+            )
+            self.conn.executemany(
+                "DELETE FROM places WHERE search = ? AND key = ?",
+                [(search_for.strip(), key) for key in removed or []],
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+def diff_path(search_for: str) -> str:
+    return os.path.join(BusinessList.save_at, f"{output_filename(search_for)}_diff.jsonl")
+
+
+def write_diff(search_for: str, changes: list[dict]):
+    with open(diff_path(search_for), 'w', encoding='utf-8') as f:
+        for change in changes:
+            f.write(json.dumps(change, ensure_ascii=False) + "\n")
+
+
+def refresh_search(page, search_for: str, total: int, snapshot: Snapshot, log_prefix: str = "",
+                   verify_embed: bool = False, output_formats: list[str] = None, downloader=None,
+                   dedupe=None, controller=None, preloaded: bool = False) -> BusinessList:
+    """Refresh one search against its snapshot and write its diff file.
+
+    Unchanged places come from the snapshot, new and changed ones are clicked
+    like in main.scrape_search. Returns the merged BusinessList.
+    """
+    previous = snapshot.load(search_for)
+    start_search(page, search_for, preloaded)
+
+    business_list = new_business_list(search_for, output_formats, downloader, dedupe)
+    cards = {}
+    feed = {}
+    seen = set()
+    entries, changes = [], []
+    reused = 0
+    for href in harvest_place_hrefs(page, total, log_prefix=log_prefix, cards=cards, status=feed):
+        key = place_key(href)
+        seen.add(key)
+        fp = fingerprint(cards.get(href))
+        try:
+            if key in previous and previous[key][0] == fp:
+                _, business, image = previous[key]
+                if image:
+                    business_list.save_image(business, image)
+                reused += 1
+            else:
+                business = scrape_listing(page, listing_for_href(page, href), search_for, business_list,
+                                          verify_embed, controller, href)
+                if key not in previous:
+                    changes.append({"change": ADDED, "key": key, "name": business.name, "address": business.address})
+                else:
+                    before = previous[key][1]
+                    fields = changed_fields(before, business)
+                    # a card line like the review count changed, no scraped field did:
+                    # only the snapshot (new fingerprint) is updated
+                    if fields:
+                        changes.append({
+                            "change": CHANGED, "key": key, "name": business.name, "fields": fields,
+                            "before": {name: getattr(before, name) for name in fields},
+                            "after": {name: getattr(business, name) for name in fields},
+                        })
+            entries.append((key, fp, business))
+            business_list.add_business(business, key)
+            print(f"{log_prefix}Business: {business.name}, Telah disimpan", end='\r')
+        except ThrottledError:
+            raise
+        except Exception as e:
+            print(f'{log_prefix}Error occurred: {e}')
+
+    # a feed not read up to its end marker says nothing about the places after it
+    removed = [key for key in previous if key not in seen] if feed["end"] else []
+    for key in removed:
+        business = previous[key][1]
+        changes.append({"change": REMOVED, "key": key, "name": business.name, "address": business.address})
+
+    stored = []
+    for key, fp, business in entries:
+        if downloader is not None:
+            downloader.wait_for(business)
+        stored.append((key, fp, business, read_image(business_list, business)))
+    snapshot.replace(search_for, stored, removed)
+    write_diff(search_for, changes)
+
+    counts = {change: sum(1 for c in changes if c["change"] == change) for change in (ADDED, CHANGED, REMOVED)}
+    print(f"{log_prefix}Refresh: {reused} unchanged, {counts[ADDED]} added, {counts[CHANGED]} changed, "
+          f"{counts[REMOVED]} removed")
+    return business_list
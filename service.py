@@ -0,0 +1,375 @@
+"""Long-running scrape service with a local HTTP API.
+
+Keeps `browsers` warm browser threads (each its own Playwright, context and
+page) and runs searches sent over HTTP through the normal scrape_search path:
+
+    GET /search?q=restoran+kota+Batu&total=20
+        application/x-ndjson, one Business record per line as it is scraped;
+        the X-Result header says whether it came from a new scrape (miss), the
+        cache (hit) or a scrape already running for the same query (coalesced)
+    GET /health    {"status": "ok" | "starting" | "degraded", "browsers": ...}
+    GET /queue     queue depth, running searches, cache size and counters
+
+Identical queries (same search and total) arriving while one is queued or
+running share that scrape. Finished results are kept in an in-memory LRU
+cache for `cache_ttl` seconds. A browser that crashes (or whose page is
+closed) during a search is relaunched; /health counts it as not ready until
+it is back. With --fixture, the browsers are routed to fixture_server's local
+stand-in for Maps, so the service can be tried and tested offline:
+
+    python service.py --port 8780 --browsers 2 --lean
+    python service.py --fixture --places 60
+    curl -N "http://127.0.0.1:8780/search?q=wisata+kota+Batu&total=10"
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+HIT = "hit"
+MISS = "miss"
+COALESCED = "coalesced"
+
+
+def query_key(search_for: str, total: int) -> tuple:
+    return " ".join(search_for.lower().split()), total
+
+
+class Job:
+    """One scrape shared by every request for the same query.
+
+    Acts as the BusinessList writer of the scrape, so records are available
+    to the streaming responses as soon as they are added.
+    """
+
+    def __init__(self, search_for: str, total: int, records: list = None):
+        self.search_for = search_for
+        self.total = total
+        self.records = list(records or [])
+        self.done = records is not None
+        self.error = None
+        self.condition = threading.Condition()
+
+    def write(self, business):
+        with self.condition:
+            self.records.append(asdict(business))
+            self.condition.notify_all()
+
+    def close(self):
+        """BusinessList.save() closes its writer; the job ends in finish()"""
+
+    def finish(self, error: str = None):
+        with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+    def stream(self):
+        """Yield records as they arrive until the scrape has finished"""
+        sent = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.done or len(self.records) > sent)
+                fresh = self.records[sent:]
+                done = self.done
+            yield from fresh
+            sent += len(fresh)
+            if done and sent == len(self.records):
+                return
+
+
+class ResultCache:
+    """In-memory LRU cache of finished query results with a TTL"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.evicted = 0
+
+    def get(self, key: tuple):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            created, records = entry
+            if time.time() - created > self.ttl_seconds:
+                del self.entries[key]
+                self.evicted += 1
+                return None
+            self.entries.move_to_end(key)
+            return records
+
+    def put(self, key: tuple, records: list):
+        with self.lock:
+            self.entries[key] = (time.time(), records)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evicted += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class ScrapeService:
+    """Warm browser threads fed from a job queue, with coalescing and a result cache"""
+
+    def __init__(self, browsers: int = 1, lean: bool = False, cache_size: int = 256, cache_ttl: float = 3600,
+                 session: str = None, fixture_url: str = None, executable_path: str = None):
+        self.browsers = max(1, browsers)
+        self.lean = lean
+        self.session = session
+        self.fixture_url = fixture_url
+        self.executable_path = executable_path
+        self.cache = ResultCache(cache_size, cache_ttl)
+        self.jobs = queue.Queue()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.ready = 0
+        self.failed = 0
+        self.running = 0
+        self.relaunches = 0
+        self.started = time.time()
+        self.counters = {"requests": 0, HIT: 0, MISS: 0, COALESCED: 0, "errors": 0}
+        self.threads = []
+
+    def start(self):
+        for worker_id in range(self.browsers):
+            thread = threading.Thread(target=self._browser_thread, args=(worker_id,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def submit(self, search_for: str, total: int) -> tuple:
+        """(Job, HIT / MISS / COALESCED) for a query"""
+        key = query_key(search_for, total)
+        with self.lock:
+            self.counters["requests"] += 1
+            if self.failed == self.browsers:
+                job = Job(search_for, total, [])
+                job.error = "no browser could be started"
+                return job, MISS
+            records = self.cache.get(key)
+            if records is not None:
+                self.counters[HIT] += 1
+                return Job(search_for, total, records), HIT
+            job = self.inflight.get(key)
+            if job is not None:
+                self.counters[COALESCED] += 1
+                return job, COALESCED
+            job = Job(search_for, total)
+            self.inflight[key] = job
+            self.counters[MISS] += 1
+        self.jobs.put(job)
+        return job, MISS
+
+    def _launch(self, p) -> tuple:
+        """(browser, page) of a new browser for this service"""
+        from lean import launch_context
+        from session import session_state
+
+        browser, context = launch_context(p, lean=self.lean, headless=True, executable_path=self.executable_path,
+                                          storage_state=session_state(self.session))
+        try:
+            if self.fixture_url:
+                from benchmark import route_to_fixture
+                route_to_fixture(context, self.fixture_url)
+            return browser, context.new_page()
+        except Exception:
+            browser.close()
+            raise
+
+    def _browser_thread(self, worker_id: int):
+        # Playwright's sync API is bound to the thread that started it
+        from playwright.sync_api import sync_playwright
+
+        from main import save_business_list, scrape_search
+
+        log_prefix = f"[browser {worker_id}] "
+        with sync_playwright() as p:
+            browser = page = None
+            while True:
+                if page is None:
+                    try:
+                        browser, page = self._launch(p)
+                    except Exception as e:
+                        print(f"{log_prefix}Browser failed to start: {e}")
+                        self._browser_failed(str(e))
+                        return
+                    with self.lock:
+                        self.ready += 1
+
+                job = self.jobs.get()
+                if job is None:
+                    break
+                with self.lock:
+                    self.running += 1
+                error = None
+                try:
+                    business_list = scrape_search(page, job.search_for, job.total, log_prefix, writer=job)
+                    save_business_list(business_list, job.search_for)
+                except Exception as e:
+                    error = str(e)
+                    print(f"{log_prefix}Error occurred: {e}")
+                key = query_key(job.search_for, job.total)
+                with self.lock:
+                    self.running -= 1
+                    if error is None:
+                        self.cache.put(key, job.records)
+                    else:
+                        self.counters["errors"] += 1
+                    del self.inflight[key]
+                job.finish(error)
+
+                if error is not None and (page.is_closed() or not browser.is_connected()):
+                    # a crashed browser or closed page fails every later job: start a new one
+                    print(f"{log_prefix}Browser lost, relaunching")
+                    with self.lock:
+                        self.ready -= 1
+                        self.relaunches += 1
+                    try:
+                        browser.close()
+                    except Exception:
+                        pass
+                    page = None
+
+            with self.lock:
+                self.ready -= 1
+            browser.close()
+
+    def _browser_failed(self, error: str):
+        """Count a browser that could not start; once none is left, fail the queued jobs"""
+        with self.lock:
+            self.failed += 1
+            if self.failed < self.browsers:
+                return
+            self.inflight.clear()
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.finish(f"no browser could be started: {error}")
+
+    def health(self) -> dict:
+        alive = sum(thread.is_alive() for thread in self.threads)
+        if self.ready == self.browsers:
+            status = "ok"
+        elif alive == self.browsers:
+            status = "starting"
+        else:
+            status = "degraded"
+        return {"status": status, "browsers": self.browsers, "ready": self.ready, "relaunches": self.relaunches,
+                "uptime_s": round(time.time() - self.started, 1)}
+
+    def queue_depth(self) -> dict:
+        with self.lock:
+            return {"queued": self.jobs.qsize(), "running": self.running, "inflight": len(self.inflight),
+                    "cached": len(self.cache), "evicted": self.cache.evicted, **self.counters}
+
+
+def make_handler(service: ScrapeService, default_total: int):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+            if url.path == "/health":
+                health = service.health()
+                self.send_json(200 if health["status"] == "ok" else 503, health)
+            elif url.path == "/queue":
+                self.send_json(200, service.queue_depth())
+            elif url.path == "/search":
+                search_for = params.get("q", [""])[0].strip()
+                if not search_for:
+                    self.send_json(400, {"error": "missing q"})
+                    return
+                try:
+                    total = int(params.get("total", [default_total])[0])
+                except ValueError:
+                    self.send_json(400, {"error": "total must be an integer"})
+                    return
+                job, result = service.submit(search_for, total)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("X-Result", result)
+                self.end_headers()
+                try:
+                    for record in job.stream():
+                        self.wfile.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                    if job.error:
+                        self.wfile.write((json.dumps({"error": job.error}) + "\n").encode("utf-8"))
+                except (BrokenPipeError, ConnectionResetError):
+                    # the scrape goes on for the cache and any coalesced requests
+                    pass
+            else:
+                self.send_json(404, {"error": "not found"})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--browsers", type=int, default=1, help="warm browser threads")
+    parser.add_argument("-t", "--total", type=int, default=20, help="places per search when no total is given")
+    parser.add_argument("--cache-size", type=int, default=256, help="finished queries kept in memory")
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="seconds a finished query is served from cache")
+    parser.add_argument("--lean", action="store_true")
+    parser.add_argument("--session", type=str, help="saved storage_state to start the browsers from")
+    parser.add_argument("--fixture", action="store_true", help="serve from fixture_server instead of Google Maps")
+    parser.add_argument("--places", type=int, default=60, help="generated places with --fixture")
+    parser.add_argument("--executable-path", type=str, help="Chromium binary to use instead of Playwright's")
+    args = parser.parse_args()
+
+    fixture = None
+    if args.fixture:
+        from fixture_server import FixtureServer, generate_places
+        fixture = FixtureServer(generate_places(args.places)).start()
+        print(f"Fixture: {args.places} places on {fixture.base_url}")
+
+    service = ScrapeService(args.browsers, lean=args.lean, cache_size=args.cache_size, cache_ttl=args.cache_ttl,
+                            session=args.session, fixture_url=fixture.base_url if fixture else None,
+                            executable_path=args.executable_path).start()
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.total))
+    httpd.daemon_threads = True
+    print(f"Serving on http://{args.host}:{args.port} with {args.browsers} browser(s)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.stop()
+        if fixture is not None:
+            fixture.stop()
+
+
+if __name__ == "__main__":
+    main()
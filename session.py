@@ -0,0 +1,95 @@
+"""Warm start: reusable session state and preloaded search pages.
+
+A run used to open https://www.google.com/maps cold (no cookies, so the
+consent page may come first), then type every search into the search box.
+Now:
+
+- the context is started from a saved storage_state file (cookies and local
+  storage, including the consent choice) or from a persistent profile
+  directory, and the state is saved again at the end of the run
+- searches are opened by URL (harvester.search_url) instead of typing
+- PagePool keeps pages of the context alive across searches and preloads
+  the next search on an idle page while the current one is being scraped,
+  so the next search's feed is usually rendered by the time it starts
+"""
+import os
+
+from harvester import search_url
+
+DEFAULT_SESSION_PATH = os.path.join('GMaps Data', 'session.json')
+
+
+def session_state(path: str):
+    """storage_state argument for new_context: `path` if it was saved before"""
+    return path if path and os.path.exists(path) else None
+
+
+def save_session(context, path: str):
+    """Save cookies and local storage of `context` for the next run"""
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    try:
+        context.storage_state(path=path)
+    except Exception as e:
+        print(f"Error saving session state: {e}")
+
+
+async def save_session_async(context, path: str):
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    try:
+        await context.storage_state(path=path)
+    except Exception as e:
+        print(f"Error saving session state: {e}")
+
+
+class PagePool:
+    """Pages of one context reused across searches.
+
+    page_for() returns the page preloaded with a search (or the least recently
+    used page) and whether it was preloaded; preload() starts loading the next
+    search on an idle page without waiting for it to render.
+    """
+
+    def __init__(self, context, size: int = 2, on_new_page=None):
+        self.pages = []
+        self.preloaded = {}
+        for _ in range(max(1, size)):
+            page = context.new_page()
+            if on_new_page is not None:
+                on_new_page(page)
+            self.pages.append(page)
+        self.hits = 0
+        self.misses = 0
+
+    def preload(self, search_for: str, busy=None):
+        """Start loading `search_for` on a page other than `busy`"""
+        key = search_for.strip()
+        idle = [page for page in self.pages if page is not busy and page not in self.preloaded.values()]
+        if key in self.preloaded or not idle:
+            return
+        try:
+            # returns once the response starts, the page keeps loading in the background
+            idle[0].goto(search_url(search_for), wait_until="commit", timeout=20000)
+            self.preloaded[key] = idle[0]
+        except Exception as e:
+            print(f"Error preloading {key}: {e}")
+
+    def page_for(self, search_for: str) -> tuple:
+        """(page, preloaded) for `search_for`"""
+        page = self.preloaded.pop(search_for.strip(), None)
+        preloaded = page is not None
+        if preloaded:
+            self.hits += 1
+        else:
+            self.misses += 1
+            page = next((p for p in self.pages if p not in self.preloaded.values()), self.pages[0])
+        # most recently used last, so the next preload takes another page
+        self.pages.remove(page)
+        self.pages.append(page)
+        return page, preloaded
+
+    def print_summary(self):
+        print(f"Page pool: {len(self.pages)} pages, {self.hits} searches preloaded, {self.misses} opened on demand")
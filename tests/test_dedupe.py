@@ -0,0 +1,35 @@
+"""DedupeIndex proximity merges at low and high latitudes."""
+import math
+import random
+
+import pytest
+
+from dedupe import DedupeIndex
+from main import Business
+
+
+@pytest.mark.parametrize("lat, lng", [(-7.87, 112.53), (0.0, 0.0), (57.5, 175.0), (-59.9, 170.0), (75.0, 20.0)])
+def test_same_name_within_radius_is_merged(lat, lng):
+    rng = random.Random(7)
+    for _ in range(2000):
+        index = DedupeIndex(25)
+        lat1 = lat + rng.uniform(-1, 1)
+        lng1 = lng + rng.uniform(-1, 1)
+        distance, angle = rng.uniform(0, 24), rng.uniform(0, 2 * math.pi)
+        lat2 = lat1 + distance * math.sin(angle) / 111000
+        lng2 = lng1 + distance * math.cos(angle) / 111000 / math.cos(math.radians((lat1 + lat2) / 2))
+        assert index.admit(Business(name="Kopi Kenangan", latitude=lat1, longitude=lng1))
+        assert not index.admit(Business(name="Kopi Kenangan", latitude=lat2, longitude=lng2))
+
+
+def test_far_or_differently_named_places_are_kept():
+    index = DedupeIndex(25)
+    assert index.admit(Business(name="Kopi Kenangan", latitude=-7.87, longitude=112.53))
+    assert index.admit(Business(name="Kopi Kenangan", latitude=-7.87, longitude=112.531))
+    assert index.admit(Business(name="Bakso President", latitude=-7.87, longitude=112.53))
+
+
+def test_place_key_is_merged_anywhere():
+    index = DedupeIndex(25)
+    assert index.admit(Business(name="A", latitude=1.0, longitude=1.0), key="0x1:0x2")
+    assert not index.admit(Business(name="B", latitude=2.0, longitude=2.0), key="0x1:0x2")
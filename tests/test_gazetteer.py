@@ -0,0 +1,48 @@
+"""resolve_address on Kota Batu addresses and on addresses outside the shipped data."""
+import pytest
+
+from gazetteer import resolve_address
+
+
+@pytest.mark.parametrize("address, kecamatan, kecamatan_id, desa, desa_id", [
+    ("Jl. Dewi Sartika No.12, Sisir, Kec. Batu, Kota Batu, Jawa Timur 65314",
+     "Batu", "357901", "Sisir", "3579011004"),
+    # one-edit spelling variant of Pesanggrahan
+    ("Jl. Raya, Pesangrahan, Kec. Batu, Kota Batu, Jawa Timur", "Batu", "357901", "Pesangrahan", "3579012008"),
+    ("Jl. Raya, Pandanrejo, Kec. Bumiaji, Kota Batu, Jawa Timur",
+     "Bumiaji", "357902", "Pandanrejo", "3579022005"),
+    # no "Kec." form: whole address segments
+    ("Jl. Raya, Sumberejo, Kota Batu, Jawa Timur", "Batu", "357901", "Sumberejo", "3579012005"),
+    ("Jl. Raya, Bumiaji, Kota Batu", "Bumiaji", "357902", "Bumiaji", "3579022006"),
+])
+def test_batu_addresses(address, kecamatan, kecamatan_id, desa, desa_id):
+    resolved = resolve_address(address)
+    assert (resolved.kecamatan, resolved.kecamatan_id) == (kecamatan, kecamatan_id)
+    assert (resolved.desa, resolved.desa_id) == (desa, desa_id)
+
+
+@pytest.mark.parametrize("address", [
+    "Jl. Raya, Pandanrejo, Kec. Pasrepan, Pasuruan, Jawa Timur",
+    "Sidomulyo, Kec. Buduran, Kabupaten Sidoarjo, Jawa Timur",
+    # one edit away from kecamatan Batu
+    "Jl. Raya, Kec. Batur, Kabupaten Banjarnegara, Jawa Tengah",
+    "Jl. Batu Permai, Malang, Jawa Timur",
+    # a street named after a desa
+    "Jl. Sumberejo, Kota Batu, Jawa Timur",
+])
+def test_addresses_without_batu_regions_get_no_ids(address):
+    resolved = resolve_address(address)
+    assert resolved.kecamatan_id is None
+    assert resolved.desa_id is None
+
+
+def test_named_kecamatan_is_not_replaced_by_the_desa():
+    # Sidomulyo is a desa of kecamatan Batu, not Bumiaji
+    resolved = resolve_address("Jl. Raya, Sidomulyo, Kec. Bumiaji, Kota Batu, Jawa Timur")
+    assert (resolved.kecamatan, resolved.kecamatan_id) == ("Bumiaji", "357902")
+    assert resolved.desa_id is None
+
+
+def test_names_as_written_are_kept():
+    resolved = resolve_address("Jl. Raya, Pandanrejo, Kec. Pasrepan, Pasuruan")
+    assert (resolved.kecamatan, resolved.desa) == ("Pasrepan", "Pandanrejo")
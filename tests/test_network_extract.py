@@ -0,0 +1,82 @@
+"""parse_response -> record_to_business on synthetic Maps search/place responses.
+
+The fixtures are hand-built (made-up places, ids and photo URLs) in the
+envelope and nesting Maps uses, with every field at the position
+network_extract.PLACE_FIELDS reads. They check the parsing and the
+record -> Business mapping, and catch accidental edits to PLACE_FIELDS; they
+cannot tell when Google moves a field in its real payload. Replace them with
+saved real responses (python network_extract.py <file> to inspect one) to
+cover that.
+"""
+import os
+
+from network_extract import missing_fields, parse_response, record_to_business
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEARCH_FOR = "restoran kota Batu"
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_search_response_records():
+    records = parse_response(read_fixture("search_response.txt"))
+
+    assert [record["data_id"] for record in records] == [
+        "0x2dd7887f6b2a3b1d:0x4a0b1c2d3e4f5061",
+        "0x2dd787a1c2b3d4e5:0x1122334455667788",
+    ]
+    sate, bakso = records
+    assert sate["name"] == "Warung Sate Pak Kumis"
+    assert sate["category"] == "Restaurant"
+    assert sate["address"] == "Jl. Dewi Sartika No.12, Sisir, Kec. Batu, Kota Batu, Jawa Timur 65314"
+    assert (sate["latitude"], sate["longitude"]) == (-7.871, 112.5268)
+    assert sate["place_id"] == "ChIJHTsqa3-I1y0RYVBPPi0cC0o"
+    # (183, 2, 2, 0)
+    assert sate["plus_code"] == "4GHG+JP Batu, East Java"
+    assert sate["monday_hours"] == "8 AM–10 PM"
+    assert sate["photo"] is None
+    assert bakso["plus_code"] is None
+    assert bakso["monday_hours"] is None
+
+
+def test_search_response_businesses():
+    sate, bakso = (record_to_business(record, SEARCH_FOR)
+                   for record in parse_response(read_fixture("search_response.txt")))
+
+    assert sate.name == "Warung Sate Pak Kumis"
+    assert sate.plus_code == "4GHG+JP"
+    assert (sate.latitude, sate.longitude) == (-7.871, 112.5268)
+    assert sate.jam_operasional == "08.00-22.00 WIB"
+    assert (sate.kecamatan, sate.kecamatan_id) == ("Batu", "357901")
+    assert (sate.desa, sate.desa_id) == ("Sisir", "3579011004")
+    assert "0x2dd7887f6b2a3b1d%3A0x4a0b1c2d3e4f5061" in sate.iframe_url
+    assert missing_fields(sate) == []
+
+    # no plus code in the payload: encoded from the coordinates
+    assert bakso.plus_code == "4GXQ+GJ"
+    assert (bakso.kecamatan_id, bakso.desa_id) == ("357902", "3579022006")
+    assert missing_fields(bakso) == []
+
+
+def test_place_response():
+    records = parse_response(read_fixture("place_response.txt"))
+
+    assert len(records) == 1
+    record = records[0]
+    # (72, 0, 1, 6, 0)
+    assert record["photo"] == "https://lh5.googleusercontent.com/p/AF1QipBaksoPresident=w408-h306-k-no"
+    assert record["monday_hours"] == "Open 24 hours"
+
+    business = record_to_business(record, SEARCH_FOR)
+    assert business.name == "Bakso President Batu"
+    assert business.jam_operasional == "24 Jam"
+    assert missing_fields(business) == []
+
+
+def test_unparseable_bodies():
+    assert parse_response("") == []
+    assert parse_response(")]}'\nnot json") == []
+    assert parse_response(")]}'\n[[1, 2], [\"x\"]]") == []
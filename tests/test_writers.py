@@ -0,0 +1,73 @@
+"""Output formats: row-wise and column-wise batches read back line by line."""
+import csv
+import json
+
+import numpy as np
+
+from main import Business
+from writers import CsvFormat, JsonlFormat, StreamWriter
+
+COLUMNS = ["name", "latitude", "longitude", "desa_id"]
+
+
+def chunk(start: int, size: int) -> dict:
+    return {
+        "name": [f"place {i}" for i in range(start, start + size)],
+        "latitude": np.linspace(-7.9, -7.8, size),
+        "longitude": np.linspace(112.5, 112.6, size),
+        "desa_id": np.arange(start, start + size),
+    }
+
+
+def test_jsonl_write_columns_has_no_blank_lines(tmp_path):
+    path = tmp_path / "out.jsonl"
+    output = JsonlFormat(str(path), COLUMNS)
+    output.write_columns(chunk(0, 3))
+    output.write_columns(chunk(3, 0))
+    output.write_columns(chunk(3, 2))
+    output.close()
+
+    lines = path.read_text(encoding="utf-8").split("\n")
+    assert lines[-1] == ""
+    records = [json.loads(line) for line in lines[:-1]]
+    assert [record["name"] for record in records] == [f"place {i}" for i in range(5)]
+    assert records[0]["latitude"] == -7.9
+    assert records[4]["desa_id"] == 4
+
+
+def test_jsonl_rows_and_columns_mix(tmp_path):
+    path = tmp_path / "out.jsonl"
+    output = JsonlFormat(str(path), COLUMNS)
+    output.write_rows([{"name": "first", "latitude": 1.0, "longitude": 2.0, "desa_id": "7"}])
+    output.write_columns(chunk(0, 2))
+    output.write_rows([{"name": "last", "latitude": 1.0, "longitude": 2.0, "desa_id": "8"}])
+    output.close()
+
+    with open(path, encoding="utf-8") as f:
+        names = [json.loads(line)["name"] for line in f]
+    assert names == ["first", "place 0", "place 1", "last"]
+
+
+def test_csv_write_columns(tmp_path):
+    path = tmp_path / "out.csv"
+    output = CsvFormat(str(path), COLUMNS)
+    output.write_columns(chunk(0, 2))
+    output.write_columns(chunk(2, 2))
+    output.close()
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["name"] for row in rows] == [f"place {i}" for i in range(4)]
+    assert rows[3]["desa_id"] == "3"
+
+
+def test_stream_writer_batches(tmp_path):
+    writer = StreamWriter(str(tmp_path / "search"), ["csv", "jsonl"], batch_size=2)
+    for i in range(5):
+        writer.write(Business(name=f"place {i}"))
+    writer.close()
+
+    with open(tmp_path / "search.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line)["name"] for line in f] == [f"place {i}" for i in range(5)]
+    with open(tmp_path / "search.csv", newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 5
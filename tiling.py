@@ -0,0 +1,190 @@
+"""Geographic tiling search.
+
+One query returns at most one results feed (about 120 places). Tiling splits
+the bounding box of the search region into a grid of tiles and runs the query
+once per tile viewport through the map URL
+(/maps/search/<query>/@<lat>,<lng>,<zoom>z). A tile whose feed is cut off
+before "reached the end of the list" is dense and is split into four
+quadrants, down to `max_depth` levels.
+
+Tiles run on the async engine: at most `tile_concurrency` tile feeds are
+scrolled at once, their place hrefs are deduped by place data id across all
+tiles and extracted on up to `tabs` shared tabs, and every search ends up in
+a single output.
+"""
+import asyncio
+import math
+import os
+from dataclasses import dataclass
+from urllib.parse import quote_plus
+
+from playwright.async_api import async_playwright
+
+from async_engine import block_route, harvest_place_urls, scrape_place
+from dedupe import DedupeIndex
+from geocode import METERS_PER_DEGREE, calculate_delta, region_reference
+from harvester import place_key
+from main import BusinessList, save_business_list
+
+# map width (px) left of the results panel in the default 1280px window
+VIEWPORT_PX = 900
+
+
+@dataclass(frozen=True)
+class Tile:
+    south: float
+    west: float
+    north: float
+    east: float
+    depth: int = 0
+
+    @property
+    def center(self) -> tuple:
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    @property
+    def width_meters(self) -> float:
+        lat = self.center[0]
+        return (self.east - self.west) * METERS_PER_DEGREE * math.cos(math.radians(lat))
+
+    def zoom(self) -> int:
+        """Largest zoom whose viewport still shows the whole tile"""
+        lat = self.center[0]
+        meters_per_px_z0 = 156543.03392 * math.cos(math.radians(lat))
+        zoom = math.log2(meters_per_px_z0 * VIEWPORT_PX / max(self.width_meters, 1))
+        return max(3, min(21, math.floor(zoom)))
+
+    def search_url(self, search_for: str) -> str:
+        lat, lng = self.center
+        return f"https://www.google.com/maps/search/{quote_plus(search_for.strip())}/@{lat:.7f},{lng:.7f},{self.zoom()}z"
+
+    def subdivide(self) -> list:
+        lat, lng = self.center
+        depth = self.depth + 1
+        return [
+            Tile(self.south, self.west, lat, lng, depth),
+            Tile(self.south, lng, lat, self.east, depth),
+            Tile(lat, self.west, self.north, lng, depth),
+            Tile(lat, lng, self.north, self.east, depth),
+        ]
+
+
+def parse_bbox(text: str) -> Tile:
+    """Tile from "south,west,north,east" """
+    south, west, north, east = (float(part) for part in text.split(','))
+    return Tile(min(south, north), min(west, east), max(south, north), max(west, east))
+
+
+def region_bbox(search_for: str, radius_meters: float = 5000) -> Tile:
+    """Square around the reference point of the region named in the search"""
+    lat, lng = region_reference(search_for)
+    delta_lat, delta_lng = calculate_delta(lat, radius_meters)
+    return Tile(lat - delta_lat, lng - delta_lng, lat + delta_lat, lng + delta_lng)
+
+
+def grid_tiles(bbox: Tile, tile_meters: float) -> list:
+    """Split `bbox` into a grid of tiles about `tile_meters` wide"""
+    lat, _ = bbox.center
+    delta_lat, delta_lng = calculate_delta(lat, tile_meters)
+    rows = max(1, math.ceil((bbox.north - bbox.south) / delta_lat))
+    cols = max(1, math.ceil((bbox.east - bbox.west) / delta_lng))
+    step_lat = (bbox.north - bbox.south) / rows
+    step_lng = (bbox.east - bbox.west) / cols
+    return [
+        Tile(bbox.south + row * step_lat, bbox.west + col * step_lng,
+             bbox.south + (row + 1) * step_lat, bbox.west + (col + 1) * step_lng)
+        for row in range(rows) for col in range(cols)
+    ]
+
+
+class TileScheduler:
+    """Runs the tiles of one search with bounded concurrency and adaptive
+    subdivision, extracting every place once
+    """
+
+    def __init__(self, context, search_for: str, total: int, tabs: int = 4, tile_concurrency: int = 2,
+                 max_depth: int = 2, min_tile_meters: float = 250, dense_at: int = 100, dedupe=None):
+        self.context = context
+        self.search_for = search_for
+        self.total = total
+        self.max_depth = max_depth
+        self.min_tile_meters = min_tile_meters
+        self.dense_at = dense_at
+        self.tab_slots = asyncio.Semaphore(tabs)
+        self.tile_slots = asyncio.Semaphore(tile_concurrency)
+        self.business_list = BusinessList(dedupe=dedupe, search_for=search_for)
+        self.seen = set()
+        self.place_tasks = []
+        self.tiles_done = 0
+        self.tiles_split = 0
+
+    def is_dense(self, tile: Tile, found: int, ended: bool) -> bool:
+        # a long feed that stops without the end-of-list marker was cut off
+        return (found >= self.dense_at and not ended and tile.depth < self.max_depth
+                and tile.width_meters / 2 >= self.min_tile_meters)
+
+    async def run_tile(self, tile: Tile):
+        if len(self.seen) >= self.total:
+            return
+        async with self.tile_slots:
+            log_prefix = f"[tile {tile.center[0]:.4f},{tile.center[1]:.4f} z{tile.zoom()}] "
+            page = await self.context.new_page()
+            href_queue = asyncio.Queue()
+            harvester = asyncio.create_task(harvest_place_urls(
+                page, self.search_for, self.total, href_queue, log_prefix=log_prefix,
+                url=tile.search_url(self.search_for),
+            ))
+            try:
+                while (href := await href_queue.get()) is not None:
+                    key = place_key(href)
+                    if key in self.seen or len(self.seen) >= self.total:
+                        continue
+                    self.seen.add(key)
+                    self.place_tasks.append((key, asyncio.create_task(scrape_place(
+                        self.context, href, self.search_for, self.business_list, self.tab_slots, log_prefix
+                    ))))
+                found, ended = await harvester
+            except Exception as e:
+                print(f"{log_prefix}Error occurred: {e}")
+                found, ended = 0, True
+            finally:
+                await page.close()
+            self.tiles_done += 1
+
+        if self.is_dense(tile, found, ended):
+            self.tiles_split += 1
+            await asyncio.gather(*(self.run_tile(sub_tile) for sub_tile in tile.subdivide()))
+
+    async def run(self, tiles: list) -> BusinessList:
+        await asyncio.gather(*(self.run_tile(tile) for tile in tiles))
+        keys = [key for key, _ in self.place_tasks]
+        businesses = await asyncio.gather(*(task for _, task in self.place_tasks))
+        for key, business in zip(keys, businesses):
+            if business is not None:
+                self.business_list.add_business(business, key)
+        print(f"Tiles: {self.tiles_done} searched, {self.tiles_split} split, {len(self.seen)} unique places")
+        return self.business_list
+
+
+async def run_tiled(search_list: list[str], total: int, tile_meters: float = 2000, bbox: Tile = None,
+                    radius_meters: float = 5000, tabs: int = 4, tile_concurrency: int = 2,
+                    max_depth: int = 2, lean: bool = False, dedupe_meters: float = 25):
+    """Scrape and save every search in `search_list` tile by tile"""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=lean)
+        context = await browser.new_context(locale="en-GB")
+        if lean:
+            await context.route("**/*", block_route)
+        dedupe = DedupeIndex(dedupe_meters, os.path.join(BusinessList.save_at, 'dedupe_log.jsonl'))
+
+        for search_for_index, search_for in enumerate(search_list):
+            print(f"-----\n{search_for_index} - {search_for}".strip())
+            tiles = grid_tiles(bbox or region_bbox(search_for, radius_meters), tile_meters)
+            scheduler = TileScheduler(context, search_for, total, tabs, tile_concurrency, max_depth, dedupe=dedupe)
+            business_list = await scheduler.run(tiles)
+            save_business_list(business_list, search_for)
+
+        await context.close()
+        await browser.close()
+    dedupe.close()
+    dedupe.print_summary()
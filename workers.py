@@ -0,0 +1,279 @@
+"""Parallel scraping: spread searches and their places over N browser processes.
+
+Every worker owns its own Playwright instance, browser and context and gets
+one task at a time from the parent: a search, whose results feed it scrolls
+while reporting every place href it finds, or a place, which it opens by URL.
+The parent hands out places before new searches, so a single search keeps all
+workers busy while its feed is still being harvested.
+
+Because the parent assigns every task, it knows what each worker holds. A
+worker process that dies (out of memory, a crashed Playwright driver, a
+signal) has its place retried once on another worker, then counted as an
+error; a feed it was scrolling ends with the places found so far. The run
+only stops early when no worker is left.
+
+Scraped places go back to the parent, which assembles each search's
+BusinessList in feed order and saves it once all of its places are in. The
+parent holds the run's dedupe.DedupeIndex, so a place found by several
+searches is written once no matter which workers scraped it.
+"""
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from dataclasses import asdict
+
+from playwright.sync_api import sync_playwright
+
+import profiling
+import readiness
+from lean import launch_context
+from session import session_state
+
+SEARCH = "search"
+FOUND = "found"
+HARVESTED = "harvested"
+PLACE = "place"
+IDLE = "idle"
+
+
+def task_key(task: tuple) -> tuple:
+    """(SEARCH, search index) of a search task, (search index, position) of a place task"""
+    return (SEARCH, task[1]) if task[0] == SEARCH else (task[1], task[2])
+
+
+def scrape_place(page, href: str, search_for: str, business_list):
+    """Open a place by URL and extract its panel (images go through business_list)"""
+    from main import extract_panel
+
+    page.goto(href, timeout=20000)
+    if not readiness.wait_for_place_panel(page, href):
+        raise TimeoutError("place panel did not load")
+    return extract_panel(page, search_for, business_list)
+
+
+def run_worker(worker_id: int, task_queue, result_queue, total: int, lean: bool = False,
+               session: str = None, image_threads: int = 0):
+    """Run the tasks of `task_queue` until a None sentinel arrives.
+
+    A search reports every href it finds, then how many it found; a place
+    is reported with its Business (as a dict) or its error; every finished
+    task is followed by an IDLE message asking for the next one, all on
+    `result_queue`. With `image_threads`, images are downloaded in the
+    background and a place is reported once its image is written. Workers
+    start from the saved `session` state but do not write it back.
+    """
+    # imported here so spawned children do not re-import main as __main__
+    from harvester import harvest_place_hrefs, place_key, start_search
+    from main import BusinessList
+
+    log_prefix = f"[worker {worker_id}] "
+    downloader = None
+    if image_threads > 0:
+        from images import ImageDownloader
+        downloader = ImageDownloader(os.path.join(BusinessList.save_at, 'images'), threads=image_threads)
+    # images are saved under the run's output folder
+    images = BusinessList(downloader=downloader)
+    waiting = []
+
+    def report_done(wait: bool = False):
+        """Report scraped places whose image download has finished"""
+        still_waiting = []
+        for summary, business in waiting:
+            if downloader is not None:
+                if not wait and not downloader.is_done(business):
+                    still_waiting.append((summary, business))
+                    continue
+                downloader.wait_for(business)
+            summary["business"] = asdict(business)
+            result_queue.put(summary)
+        waiting[:] = still_waiting
+
+    with sync_playwright() as p:
+        browser, context = launch_context(p, lean=lean, storage_state=session_state(session))
+        page = context.new_page()
+        result_queue.put({"kind": IDLE, "worker": worker_id})
+
+        while True:
+            report_done()
+            try:
+                task = task_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if task is None:
+                break
+
+            if task[0] == SEARCH:
+                _, search_for_index, search_for = task
+                print(f"-----\n{log_prefix}{search_for_index} - {search_for}".strip())
+                summary = {"kind": HARVESTED, "worker": worker_id, "search": search_for_index,
+                           "places": 0, "error": None}
+                try:
+                    start_search(page, search_for)
+                    for href in harvest_place_hrefs(page, total, log_prefix=log_prefix):
+                        result_queue.put({"kind": FOUND, "worker": worker_id, "search": search_for_index,
+                                          "position": summary["places"], "href": href})
+                        summary["places"] += 1
+                except Exception as e:
+                    summary["error"] = str(e)
+                result_queue.put(summary)
+            else:
+                _, search_for_index, position, search_for, href = task
+                summary = {"kind": PLACE, "worker": worker_id, "search": search_for_index, "position": position,
+                           "key": place_key(href), "business": None, "error": None}
+                try:
+                    business = scrape_place(page, href, search_for, images)
+                    waiting.append((summary, business))
+                except Exception as e:
+                    summary["error"] = str(e)
+                    result_queue.put(summary)
+            result_queue.put({"kind": IDLE, "worker": worker_id})
+
+        report_done(wait=True)
+        context.close()
+        browser.close()
+
+    if downloader is not None:
+        downloader.close()
+    print(f"-----\n{log_prefix}done")
+    readiness.print_summary()
+    profiling.print_summary()
+
+
+def run_worker_pool(search_list: list[str], total: int, workers: int, lean: bool = False, session: str = None,
+                    output_formats: list[str] = None, image_threads: int = 0, dedupe_meters: float = 25):
+    """Scrape `search_list` with `workers` browser processes, save every search and print a summary"""
+    from dedupe import DedupeIndex
+    from main import Business, BusinessList, new_business_list, save_business_list
+
+    workers = max(1, workers)
+    ctx = multiprocessing.get_context("spawn")
+    task_queues = [ctx.Queue() for _ in range(workers)]
+    result_queue = ctx.Queue()
+    processes = [
+        ctx.Process(target=run_worker, args=(worker_id, task_queues[worker_id], result_queue, total, lean,
+                                             session, image_threads))
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    dedupe = DedupeIndex(dedupe_meters, os.path.join(BusinessList.save_at, 'dedupe_log.jsonl'))
+    started = {index: time.perf_counter() for index in range(len(search_list))}
+    pending_searches = deque((SEARCH, index, search_for) for index, search_for in enumerate(search_list))
+    pending_places = deque()
+    # tasks each worker holds: its current task plus places waiting for their image
+    held = {worker_id: {} for worker_id in range(workers)}
+    idle = set()
+    live = set(range(workers))
+    retried = set()
+    expected = {}
+    found = {index: set() for index in range(len(search_list))}
+    places = {index: {} for index in range(len(search_list))}
+    totals = {worker_id: {"searches": 0, "places": 0, "errors": 0} for worker_id in range(workers)}
+    saved = 0
+
+    def record_place(summary: dict):
+        index = summary["search"]
+        if summary["position"] in places[index]:
+            return
+        places[index][summary["position"]] = (summary["key"], summary["business"])
+        stats = totals[summary["worker"]]
+        if summary["error"]:
+            stats["errors"] += 1
+            print(f"[worker {summary['worker']}] Error occurred: {summary['error']}")
+        else:
+            stats["places"] += 1
+
+    def record_harvest(summary: dict):
+        index = summary["search"]
+        expected[index] = summary["places"]
+        stats = totals[summary["worker"]]
+        stats["searches"] += 1
+        if summary["error"]:
+            stats["errors"] += 1
+            print(f"[worker {summary['worker']}] Feed failed after {summary['places']} places: "
+                  f"{search_list[index].strip()} ({summary['error']})")
+
+    def lose_worker(worker_id: int):
+        """Retry (once) or fail the tasks of a worker process that died"""
+        live.discard(worker_id)
+        idle.discard(worker_id)
+        print(f"[worker {worker_id}] Exited with code {processes[worker_id].exitcode}")
+        for key, task in held.pop(worker_id).items():
+            if task[0] == SEARCH:
+                _, index, _ = task
+                record_harvest({"worker": worker_id, "search": index, "places": len(found[index]),
+                                "error": "worker died"})
+            elif key not in retried:
+                retried.add(key)
+                pending_places.appendleft(task)
+            else:
+                _, index, position, _, href = task
+                record_place({"worker": worker_id, "search": index, "position": position,
+                              "key": None, "business": None, "error": f"worker died twice on {href}"})
+
+    while saved < len(search_list):
+        while idle and (pending_places or pending_searches):
+            worker_id = idle.pop()
+            task = pending_places.popleft() if pending_places else pending_searches.popleft()
+            held[worker_id][task_key(task)] = task
+            task_queues[worker_id].put(task)
+
+        if not live:
+            print("Error occured: all workers exited before finishing the search list")
+            break
+        # exited before the wait, so every message it sent is already readable
+        exited = [worker_id for worker_id in live if processes[worker_id].exitcode is not None]
+        try:
+            summary = result_queue.get(timeout=1)
+        except queue.Empty:
+            for worker_id in exited:
+                lose_worker(worker_id)
+        else:
+            index = summary.get("search")
+            worker_held = held.get(summary["worker"], {})
+            if summary["kind"] == IDLE:
+                if summary["worker"] in live:
+                    idle.add(summary["worker"])
+                continue
+            if summary["kind"] == FOUND:
+                found[index].add(summary["position"])
+                pending_places.append((PLACE, index, summary["position"], search_list[index], summary["href"]))
+                continue
+            if summary["kind"] == HARVESTED:
+                worker_held.pop((SEARCH, index), None)
+                record_harvest(summary)
+            else:
+                worker_held.pop((index, summary["position"]), None)
+                record_place(summary)
+
+        for index in range(len(search_list)):
+            if expected.get(index) is not None and expected[index] == len(places[index]):
+                search_for = search_list[index]
+                business_list = new_business_list(search_for, output_formats, dedupe=dedupe)
+                for position in sorted(places[index]):
+                    key, record = places[index][position]
+                    if record is not None:
+                        business_list.add_business(Business(**record), key)
+                save_business_list(business_list, search_for)
+                saved += 1
+                print(f"Done: {search_for.strip()} - {len(business_list)} businesses in "
+                      f"{time.perf_counter() - started[index]:.1f}s ({saved}/{len(search_list)})")
+                # a search is saved once
+                expected[index] = None
+
+    for worker_id in live:
+        task_queues[worker_id].put(None)
+    for process in processes:
+        process.join()
+    dedupe.close()
+
+    print("-----\nWorker summary:")
+    for worker_id, stats in totals.items():
+        print(
+            f"  worker {worker_id}: {stats['searches']} searches harvested, "
+            f"{stats['places']} places, {stats['errors']} errors"
+        )
+    dedupe.print_summary()
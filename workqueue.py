@@ -0,0 +1,335 @@
+"""Durable work queue so several processes or hosts can split one scrape.
+
+The queue is an SQLite database (GMaps Data/work_queue.sqlite by default)
+with two job kinds:
+
+- search: a search term; the worker scrolls its results feed and enqueues
+  every place href it finds as a place job
+- place: one place href; the worker opens it, extracts the panel and writes
+  the record to the shared results table
+
+Jobs are unique per kind and key (search text / place data id), so a place
+found by several searches or workers is scraped once. A worker leases one job
+at a time for `lease_seconds` (renewed while a long feed is scrolled); a job
+whose worker died becomes available again when its lease runs out, failures
+and expired leases count as attempts and are retried up to `max_attempts`
+times, and a worker can only complete a job it still holds the lease for.
+
+The database uses SQLite's rollback journal rather than WAL, since WAL needs
+shared memory between the processes and does not work on network
+filesystems. Workers on several hosts therefore need the queue file on a
+filesystem with working POSIX locks (e.g. NFSv4 with locking enabled); when
+that is not available, run all workers on one host.
+
+    python workqueue.py add -s "restoran kota Batu"      # or: add (reads input.txt)
+    python workqueue.py work --name host-a -t 200        # on every host / process
+    python workqueue.py status
+    python workqueue.py export                          # xlsx/csv per search
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import asdict
+
+DEFAULT_QUEUE_PATH = os.path.join('GMaps Data', 'work_queue.sqlite')
+SEARCH = "search"
+PLACE = "place"
+
+
+class WorkQueue:
+    """SQLite-backed job queue with leases, retries and a results table"""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH, lease_seconds: float = 600, max_attempts: int = 3):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # autocommit, transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        # rollback journal: WAL does not work on network filesystems
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                search TEXT NOT NULL,
+                total INTEGER,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                error TEXT,
+                updated REAL NOT NULL,
+                UNIQUE (kind, key)
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, kind, lease_until)")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                search TEXT NOT NULL,
+                record TEXT NOT NULL,
+                worker TEXT,
+                finished REAL NOT NULL
+            )"""
+        )
+
+    def add_searches(self, search_list: list[str], total: int = None) -> int:
+        """Enqueue searches (already queued ones are ignored); returns how many were new"""
+        now = time.time()
+        before = self.conn.total_changes
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO jobs (kind, key, payload, search, total, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            [(SEARCH, s.strip().lower(), s.strip(), s.strip(), total, now) for s in search_list if s.strip()],
+        )
+        self.conn.execute("COMMIT")
+        return self.conn.total_changes - before
+
+    def add_places(self, search_for: str, hrefs: list[str]) -> int:
+        """Enqueue place hrefs found by `search_for`, deduped by place key"""
+        from harvester import place_key
+
+        now = time.time()
+        before = self.conn.total_changes
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO jobs (kind, key, payload, search, updated) VALUES (?, ?, ?, ?, ?)",
+            [(PLACE, place_key(href), href, search_for.strip(), now) for href in hrefs],
+        )
+        self.conn.execute("COMMIT")
+        return self.conn.total_changes - before
+
+    def lease(self, worker: str):
+        """Lease the next job (place jobs first) as a dict, or None if none is available"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # a job whose worker died on its last attempt (e.g. it crashes the browser) is not retried
+            self.conn.execute(
+                "UPDATE jobs SET state = 'failed', error = 'lease expired', lease_until = NULL, updated = ? "
+                "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = self.conn.execute(
+                """SELECT id, kind, key, payload, search, total, attempts FROM jobs
+                   WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?)
+                   ORDER BY kind = 'search', id LIMIT 1""",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                    "updated = ? WHERE id = ?",
+                    (worker, now + self.lease_seconds, now, row[0]),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        keys = ("id", "kind", "key", "payload", "search", "total", "attempts")
+        return dict(zip(keys, row[:6] + (row[6] + 1,)))
+
+    def _finish(self, job: dict, worker: str, state: str, error: str = None, result=None) -> bool:
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        held = self.conn.execute(
+            "UPDATE jobs SET state = ?, error = ?, lease_until = NULL, updated = ? "
+            "WHERE id = ? AND state = 'leased' AND worker = ?",
+            (state, error, now, job["id"], worker),
+        ).rowcount
+        if held and result is not None:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (key, search, record, worker, finished) VALUES (?, ?, ?, ?, ?)",
+                (job["key"], job["search"], json.dumps(result, ensure_ascii=False), worker, now),
+            )
+        self.conn.execute("COMMIT")
+        return bool(held)
+
+    def complete(self, job: dict, worker: str, business=None) -> bool:
+        """Mark a leased job done (storing the place record); False if the lease was lost"""
+        return self._finish(job, worker, "done", result=asdict(business) if business is not None else None)
+
+    def fail(self, job: dict, worker: str, error: str) -> bool:
+        """Release a failed job for a retry, or mark it failed after max_attempts"""
+        state = "failed" if job["attempts"] >= self.max_attempts else "pending"
+        return self._finish(job, worker, state, error=error)
+
+    def extend(self, job: dict, worker: str) -> bool:
+        """Renew the lease of a long running job; False if the lease was lost"""
+        return self.conn.execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND state = 'leased' AND worker = ?",
+            (time.time() + self.lease_seconds, job["id"], worker),
+        ).rowcount > 0
+
+    def counts(self) -> dict:
+        """{(kind, state): count}"""
+        return {
+            (kind, state): count
+            for kind, state, count in self.conn.execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state")
+        }
+
+    def has_open_jobs(self) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM jobs WHERE state IN ('pending', 'leased') LIMIT 1"
+        ).fetchone() is not None
+
+    def searches(self) -> list[str]:
+        return [row[0] for row in self.conn.execute("SELECT payload FROM jobs WHERE kind = 'search' ORDER BY id")]
+
+    def results(self, search_for: str):
+        """Yield the scraped places of a search as Business objects"""
+        from main import Business
+        for (record,) in self.conn.execute(
+            "SELECT record FROM results WHERE search = ? ORDER BY finished", (search_for.strip(),)
+        ):
+            yield Business(**json.loads(record))
+
+    def print_summary(self):
+        counts = self.counts()
+        for kind in (SEARCH, PLACE):
+            states = ", ".join(f"{count} {state}" for (k, state), count in sorted(counts.items()) if k == kind)
+            print(f"Queue {kind} jobs: {states or 'none'}")
+
+    def close(self):
+        self.conn.close()
+
+
+def run_queue_worker(queue_path: str, worker: str, total: int = 1_000_000, lean: bool = False,
+                     idle_seconds: float = 5, verify_embed: bool = False):
+    """Lease and run jobs until the queue has no pending or leased jobs left"""
+    from playwright.sync_api import sync_playwright
+
+    import readiness
+    from harvester import harvest_place_hrefs, start_search
+    from lean import launch_context
+    from main import BusinessList, extract_panel
+
+    queue = WorkQueue(queue_path)
+    log_prefix = f"[{worker}] "
+    done = failed = 0
+    with sync_playwright() as p:
+        browser, context = launch_context(p, lean=lean)
+        page = context.new_page()
+        # images are saved under this host's output folder
+        images = BusinessList()
+
+        while True:
+            job = queue.lease(worker)
+            if job is None:
+                if not queue.has_open_jobs():
+                    break
+                # other workers still hold leases, their searches may add places
+                time.sleep(idle_seconds)
+                continue
+            try:
+                if job["kind"] == SEARCH:
+                    print(f"-----\n{log_prefix}search: {job['search']}")
+                    start_search(page, job["search"])
+                    hrefs = []
+                    renewed = time.monotonic()
+                    for href in harvest_place_hrefs(page, job["total"] or total, log_prefix=log_prefix):
+                        hrefs.append(href)
+                        # keep the lease while a long feed is still scrolling
+                        if time.monotonic() - renewed > queue.lease_seconds / 3:
+                            if not queue.extend(job, worker):
+                                raise TimeoutError("lease lost while scrolling the feed")
+                            renewed = time.monotonic()
+                    added = queue.add_places(job["search"], hrefs)
+                    print(f"{log_prefix}{added} new places queued")
+                    queue.complete(job, worker)
+                else:
+                    page.goto(job["payload"], timeout=20000)
+                    if not readiness.wait_for_place_panel(page, job["payload"]):
+                        raise TimeoutError("place panel did not load")
+                    business = extract_panel(page, job["search"], images, verify_embed)
+                    if queue.complete(job, worker, business):
+                        print(f"{log_prefix}Business: {business.name}, Telah disimpan", end='\r')
+                done += 1
+            except Exception as e:
+                failed += 1
+                queue.fail(job, worker, str(e))
+                print(f"{log_prefix}Error occurred: {e}")
+
+        context.close()
+        browser.close()
+    print(f"-----\n{log_prefix}done: {done} jobs, {failed} failed")
+    queue.close()
+
+
+def export(queue_path: str, output_formats: list[str] = None):
+    """Save the results of every queued search like a normal run"""
+    from main import new_business_list, save_business_list
+
+    queue = WorkQueue(queue_path)
+    for search_for in queue.searches():
+        business_list = new_business_list(search_for, output_formats)
+        for business in queue.results(search_for):
+            business_list.add_business(business)
+        save_business_list(business_list, search_for)
+        print(f"{search_for}: {len(business_list)} businesses")
+    queue.close()
+
+
+def run_queue(search_list: list[str], total: int, queue_path: str, workers: int = 1, lean: bool = False,
+              output_formats: list[str] = None):
+    """Enqueue `search_list`, work the queue with `workers` local processes and export the results"""
+    import multiprocessing
+
+    queue = WorkQueue(queue_path)
+    print(f"{queue.add_searches(search_list, total)} searches queued in {queue_path}")
+    queue.close()
+
+    name = f"{socket.gethostname()}-{os.getpid()}"
+    if workers > 1:
+        ctx = multiprocessing.get_context("spawn")
+        processes = [
+            ctx.Process(target=run_queue_worker, args=(queue_path, f"{name}-{worker_id}", total, lean))
+            for worker_id in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    else:
+        run_queue_worker(queue_path, name, total, lean)
+
+    queue = WorkQueue(queue_path)
+    queue.print_summary()
+    queue.close()
+    export(queue_path, output_formats)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["add", "work", "status", "export"])
+    parser.add_argument("--queue", type=str, default=DEFAULT_QUEUE_PATH)
+    parser.add_argument("-s", "--search", type=str)
+    parser.add_argument("-t", "--total", type=int, help="places per search (add / work)")
+    parser.add_argument("--name", type=str, default=f"{socket.gethostname()}-{os.getpid()}", help="worker name")
+    parser.add_argument("--lean", action="store_true")
+    parser.add_argument("--output-format", type=str, help="comma separated streamed outputs for export")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        from main import load_search_list
+        added = WorkQueue(args.queue).add_searches(load_search_list(args), args.total)
+        print(f"{added} searches queued")
+    elif args.command == "work":
+        run_queue_worker(args.queue, args.name, args.total or 1_000_000, lean=args.lean)
+    elif args.command == "status":
+        WorkQueue(args.queue).print_summary()
+    else:
+        formats = [name.strip() for name in args.output_format.split(',')] if args.output_format else None
+        export(args.queue, formats)
+
+
+if __name__ == "__main__":
+    main()
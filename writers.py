@@ -0,0 +1,164 @@
+"""Streaming output writers for BusinessList.
+
+A StreamWriter receives every Business as it is extracted, buffers `batch_size`
+records and appends each batch to all requested formats, so records reach disk
+while a search is still running and memory stays flat however many places a
+search returns:
+
+- csv / jsonl: appended and flushed per batch
+- parquet: one row group per batch (needs pyarrow)
+- xlsx: rows streamed into an openpyxl write-only workbook, saved once on close
+
+Besides write_rows (a list of dicts), every format takes write_columns (a
+dict of equally long columns, e.g. NumPy arrays) for column-wise producers
+such as kotak.py.
+"""
+import csv
+import json
+import os
+from dataclasses import asdict, fields
+
+from main import Business
+
+COLUMNS = [f.name for f in fields(Business)]
+FORMATS = ("csv", "jsonl", "parquet", "xlsx")
+
+
+def as_list(values) -> list:
+    """Column values as Python objects (np.float64 -> float) for json / openpyxl"""
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+class CsvFormat:
+    def __init__(self, path: str, columns: list[str] = None):
+        self.columns = columns or COLUMNS
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.columns)
+        self.writer.writeheader()
+
+    def write_rows(self, rows: list[dict]):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def write_columns(self, columns: dict):
+        import pandas as pd
+        pd.DataFrame({name: columns[name] for name in self.columns}).to_csv(self.file, header=False, index=False)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlFormat:
+    def __init__(self, path: str, columns: list[str] = None):
+        self.columns = columns or COLUMNS
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write_rows(self, rows: list[dict]):
+        self.file.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        self.file.flush()
+
+    def write_columns(self, columns: dict):
+        import pandas as pd
+        frame = pd.DataFrame({name: columns[name] for name in self.columns})
+        if len(frame):
+            text = frame.to_json(orient="records", lines=True, force_ascii=False, double_precision=15)
+            # pandas >= 2 ends the lines with a newline, older versions do not
+            self.file.write(text if text.endswith('\n') else text + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetFormat:
+    def __init__(self, path: str, columns: list[str] = None, types: dict = None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("parquet output needs pyarrow: pip install pyarrow")
+        arrow_types = {int: pa.int64(), float: pa.float64(), str: pa.string()}
+        types = types or {f.name: f.type for f in fields(Business)}
+        self.pa = pa
+        self.columns = columns or COLUMNS
+        self.schema = pa.schema([(name, arrow_types.get(types.get(name), pa.string())) for name in self.columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write_rows(self, rows: list[dict]):
+        self.write_columns({name: [row[name] for row in rows] for name in self.columns})
+
+    def write_columns(self, columns: dict):
+        # cast to the declared type, so e.g. numeric ids land in a string column
+        arrays = [self.pa.array(columns[f.name], from_pandas=True).cast(f.type) for f in self.schema]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class XlsxFormat:
+    def __init__(self, path: str, columns: list[str] = None):
+        from openpyxl import Workbook
+        self.path = path
+        self.columns = columns or COLUMNS
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.sheet.append(self.columns)
+
+    def write_rows(self, rows: list[dict]):
+        for row in rows:
+            self.sheet.append([row[name] for name in self.columns])
+
+    def write_columns(self, columns: dict):
+        for row in zip(*(as_list(columns[name]) for name in self.columns)):
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+FORMAT_CLASSES = {
+    "csv": CsvFormat,
+    "jsonl": JsonlFormat,
+    "parquet": ParquetFormat,
+    "xlsx": XlsxFormat,
+}
+
+
+class StreamWriter:
+    """Buffers businesses and appends them in batches to every output format"""
+
+    def __init__(self, base_path: str, formats: list[str], batch_size: int = 50, downloader=None):
+        unknown = [name for name in formats if name not in FORMAT_CLASSES]
+        if unknown:
+            raise ValueError(f"Unknown output format(s): {', '.join(unknown)}")
+        os.makedirs(os.path.dirname(base_path) or '.', exist_ok=True)
+        self.batch_size = batch_size
+        self.downloader = downloader
+        self.buffer = []
+        self.written = 0
+        self.outputs = [FORMAT_CLASSES[name](f"{base_path}.{name}") for name in formats]
+
+    def write(self, business: Business):
+        self.buffer.append(business)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.downloader is not None:
+            # image fields are filled by the background downloader
+            for business in self.buffer:
+                self.downloader.wait_for(business)
+        rows = [asdict(business) for business in self.buffer]
+        for output in self.outputs:
+            output.write_rows(rows)
+        self.written += len(rows)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        for output in self.outputs:
+            output.close()